@@ -0,0 +1,87 @@
+import time
+from itertools import chain
+
+from fringe import Heap_Fringe
+from path_result import Path_Result
+
+# Bounded-suboptimal searches for when a good path is needed quickly more than the optimal one. Both parts use them with the nodes and the
+# heuristic of their A*: node_type is the Node_Astar of the part, whose children get their heuristic in expand, and the fringe is
+# ordered by (g(n) + weight * h(n), action priority) instead of (f(n), action priority).
+#
+# Weighted A* (weighted_astar) makes a single search with the given weight, and its path cost is at most weight times the optimal one.
+# ARA* (ara_star) starts the same way, then lowers the weight by step and searches again, until the weight is 1 or the time limit has passed.
+# Every search after the first reuses the previous ones: the reached states keep their path costs, and only the states still in the fringe
+# and the ones whose path cost went down after they were explored (the inconsistent states) are put in the new fringe.
+#
+# Each solution comes with a proven bound on its suboptimality: the optimal path cost is at least the lowest g(n) + h(n) of the states in the
+# fringe and the inconsistent ones, so the bound is the smaller of the weight and the path cost divided by that. A bound of 1 means the path
+# is optimal. The heuristic has to be consistent, like the Manhattan distance and the linear conflicts.
+#
+# expanded_nodes is the number of reached states, like the explored + queue count of the other searches, and it is summed over the searches.
+
+
+class Anytime_Result(Path_Result):
+
+    # solutions has one dictionary per search, with the path cost, the weight, the bound, the expanded nodes and the seconds at its end.
+    def __init__(self, path_actions, expanded_nodes, bound, solutions):
+        super().__init__(path_actions, expanded_nodes)
+        self.bound = bound
+        self.solutions = solutions
+
+
+# initial_heuristic is the heuristic of the initial state, and heuristic the heuristic function given to the expand of the nodes (None
+# for the deltas of the part). With a time_limit in seconds, the searches stop once it has passed, but the first solution is always found.
+def ara_star(problem, node_type, initial_heuristic, heuristic=None, weight=3.0, step=0.5, time_limit=None, fringe_type=Heap_Fringe):
+    start = time.perf_counter()
+    initial_node = node_type(problem.initial, None, None, 0, problem.blank_key(problem.initial), initial_heuristic)
+    if problem.goal_test(initial_node.state):
+        return Anytime_Result([], 0, 1.0, [{'path_cost': 0, 'weight': weight, 'bound': 1.0, 'expanded_nodes': 0, 'seconds': 0.0}])
+    best = {initial_node.state: initial_node}  # The node with the lowest path cost of every reached state.
+    queue = {initial_node.state: initial_node}  # The nodes to put in the fringe of the next search.
+    inconsistent = {}
+    goal_node = None
+    solutions = []
+    while True:
+        explored = set()
+        fringe = fringe_type()
+        for node in queue.values():
+            fringe.put((node.path_cost + weight * node.heuristic, node.key[1]), node)
+        while fringe:
+            node = fringe.get()
+            if queue.get(node.state) is not node:
+                continue
+            # The search stops when nothing in the fringe can give a lower weighted cost than the goal; the goal itself is never expanded.
+            if goal_node is not None and node.path_cost + weight * node.heuristic >= goal_node.path_cost:
+                break
+            del queue[node.state]
+            explored.add(node.state)
+            for child in node.expand(problem, heuristic):
+                known = best.get(child.state)
+                if known is not None and known.path_cost <= child.path_cost:
+                    continue
+                best[child.state] = child
+                if problem.goal_test(child.state):
+                    goal_node = child
+                if child.state in explored:
+                    inconsistent[child.state] = child
+                else:
+                    queue[child.state] = child
+                    fringe.put((child.path_cost + weight * child.heuristic, child.key[1]), child)
+            # Out of time in the middle of a search: the goal can only have got closer since the last solution, so its bound still holds.
+            if solutions and time_limit is not None and time.perf_counter() - start > time_limit:
+                return Anytime_Result(goal_node.actions(), len(best), solutions[-1]['bound'], solutions)
+        if goal_node is None:
+            return Anytime_Result(None, len(best), None, solutions)
+        lower_bound = min((node.path_cost + node.heuristic for node in chain(queue.values(), inconsistent.values())), default=None)
+        bound = 1.0 if lower_bound is None else max(1.0, min(weight, goal_node.path_cost / lower_bound))
+        solutions.append({'path_cost': goal_node.path_cost, 'weight': weight, 'bound': bound, 'expanded_nodes': len(best),
+                          'seconds': time.perf_counter() - start})
+        if bound == 1.0 or weight <= 1 or (time_limit is not None and time.perf_counter() - start > time_limit):
+            return Anytime_Result(goal_node.actions(), len(best), bound, solutions)
+        weight = max(1.0, weight - step)
+        queue.update(inconsistent)
+        inconsistent = {}
+
+# A single search with the given weight, i.e. the first search of ARA*.
+def weighted_astar(problem, node_type, initial_heuristic, heuristic=None, weight=2.0, fringe_type=Heap_Fringe):
+    return ara_star(problem, node_type, initial_heuristic, heuristic, weight, time_limit=0, fringe_type=fringe_type)
@@ -0,0 +1,239 @@
+import argparse
+import glob
+import io
+import json
+import os
+import resource
+import signal
+import sys
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+
+import compact_output
+import part1
+import part2
+
+# Batch mode for part1 and part2. Many puzzles are read from directories, glob patterns or a JSONL stream on stdin and solved on a
+# process pool, so the interpreter is started once per worker instead of once per puzzle. Results are streamed out as soon as they
+# are ready, either in the same format as the output files of part1.py/part2.py or as JSONL.
+#
+#   python3 batch.py 1 example_inputs --workers 4
+#   python3 batch.py 2 'inputs/*.txt' --format jsonl --order completion --timeout 10 --memory 512
+#   cat puzzles.jsonl | python3 batch.py 1 - --output-dir outputs
+#
+# Every line of the JSONL input is an object like {"id": "puzzle_1", "state": "1 2 3 4 5 6 7 8 0"}. A line that cannot be read gets an
+# error record, like a puzzle that fails, and the batch goes on.
+#
+# --format compact and --format binary write the compact formats of compact_output.py, with the actions packed in a few bits each
+# (--states adds the states along the paths to the compact JSONL). The output of every record is written to stdout in one piece and
+# flushed, so it comes out as soon as the record is ready.
+
+
+class Puzzle_Timeout(Exception):
+    pass
+
+
+def raise_timeout(signum, frame):
+    raise Puzzle_Timeout()
+
+# Runs once in every worker. The memory cap is an address space limit on the whole worker, so a puzzle that exceeds it fails with a
+# MemoryError instead of making the machine swap.
+def init_worker(memory_mb):
+    signal.signal(signal.SIGALRM, raise_timeout)
+    if memory_mb:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+# Search_Result as a dictionary. Search results hold the whole tree of nodes, so they are not sent between processes.
+def result_record(result, **fields):
+    if result.path_cost is None:
+        raise ValueError('the goal cannot be reached from the given state')
+    fields.update(expanded_nodes=result.expanded_nodes, path_cost=result.path_cost, actions=result.actions())
+    return fields
+
+# Solves one puzzle. The result is a dictionary with plain values only, since it is sent back from the worker.
+def solve_puzzle(part, puzzle_id, input_state, timeout):
+    if timeout:
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        if part == 1:
+            record = {'id': puzzle_id, 'status': 'ok',
+                      'results': [result_record(result, algorithm=name) for name, result in part1.solve_all(input_state)]}
+        else:
+            record = result_record(part2.solve(input_state), id=puzzle_id, status='ok')
+    except Puzzle_Timeout:
+        record = {'id': puzzle_id, 'status': 'timeout', 'error': 'no solution within ' + str(timeout) + ' seconds'}
+    except MemoryError:
+        record = {'id': puzzle_id, 'status': 'memory', 'error': 'memory cap exceeded'}
+    except Exception as error:
+        record = {'id': puzzle_id, 'status': 'error', 'error': repr(error)}
+    finally:
+        if timeout:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    record['state'] = input_state
+    return record
+
+# A task is a chunk of puzzles, so small puzzles do not pay for a round trip to the pool each. A puzzle whose input could not be read
+# comes with its error instead of a state and gets an error record.
+def solve_chunk(part, chunk, timeout):
+    records = []
+    for puzzle_id, input_state, error in chunk:
+        if error is None:
+            records.append(solve_puzzle(part, puzzle_id, input_state, timeout))
+        else:
+            records.append({'id': puzzle_id, 'status': 'error', 'error': error, 'state': None})
+    return records
+
+
+# Yields (id, packed state, error) for every puzzle in the given sources, in order. A source is a directory (every .txt file in it),
+# a glob pattern or a single file, or '-' for JSONL on stdin. The error is None, or the reason a file or a line of the JSONL could not be read.
+def read_puzzles(part, sources):
+    module = part1 if part == 1 else part2
+    for source in sources:
+        if source == '-':
+            for line_number, line in enumerate(sys.stdin, 1):
+                if line.strip():
+                    puzzle_id = str(line_number)
+                    try:
+                        puzzle = json.loads(line)
+                        puzzle_id = str(puzzle.get('id', line_number))
+                        yield puzzle_id, module.board_3x3.parse(puzzle['state']), None
+                    except Exception as error:
+                        yield puzzle_id, None, repr(error)
+            continue
+        if os.path.isdir(source):
+            paths = sorted(glob.glob(os.path.join(source, '*.txt')))
+        else:
+            paths = sorted(glob.glob(source)) or [source]
+        for path in paths:
+            try:
+                input_state = module.read_input(path)
+            except Exception as error:
+                yield os.path.basename(path), None, repr(error)
+                continue
+            yield os.path.basename(path), input_state, None
+
+# The name of the output file of a puzzle in --output-dir. The ids of the JSONL input can be anything, so the path separators are replaced
+# and the file is always in the directory.
+def output_name(puzzle_id):
+    name = puzzle_id.replace('/', '_').replace('\\', '_').replace('\0', '_')
+    if name in ('', '.', '..'):
+        name = '_' + name
+    return name
+
+def chunks(puzzles, size):
+    chunk = []
+    for puzzle in puzzles:
+        chunk.append(puzzle)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+# Yields the records of the solved puzzles as their chunks finish. With order 'input' the records keep the order of the input,
+# with order 'completion' they come out as soon as they are ready. At most 2 chunks per worker are in the pool at a time, and a new
+# chunk is read when one finishes, so the records come out while the input is still being read and an endless input takes no more memory.
+def solve_batch(part, puzzles, workers=None, chunk_size=1, order='input', timeout=None, memory_mb=None):
+    tasks = chunks(puzzles, chunk_size)
+    window = 2 * (workers or os.cpu_count())
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(memory_mb,)) as executor:
+
+        def submit(count):
+            return [executor.submit(solve_chunk, part, chunk, timeout) for chunk in islice(tasks, count)]
+        if order == 'input':
+            futures = deque(submit(window))
+            while futures:
+                records = futures.popleft().result()
+                futures.extend(submit(1))
+                for record in records:
+                    yield record
+        else:
+            futures = set(submit(window))
+            while futures:
+                done, futures = wait(futures, return_when=FIRST_COMPLETED)
+                futures.update(submit(len(done)))
+                for future in done:
+                    for record in future.result():
+                        yield record
+
+
+# Gives a result record back the Search_Result interface that write_output uses.
+class Recorded_Result:
+
+    def __init__(self, record):
+        self.expanded_nodes = record['expanded_nodes']
+        self.path_cost = record['path_cost']
+        self.recorded_actions = record['actions']
+
+    def actions(self):
+        return self.recorded_actions
+
+
+# The text of the output file part1.py or part2.py would have written for the record.
+def format_text(part, record):
+    file = io.StringIO()
+    if record['status'] != 'ok':
+        file.write('Error: ' + record['status'] + ' (' + record['error'] + ')\n')
+    elif part == 1:
+        part1.write_output(file, [(result['algorithm'], Recorded_Result(result)) for result in record['results']])
+    else:
+        part2.write_output(file, record['state'], Recorded_Result(record))
+    return file.getvalue()
+
+def format_jsonl(part, record):
+    record = dict(record)
+    if record['state'] is not None:
+        record['state'] = part1.unpack_state(record['state'])
+    return json.dumps(record) + '\n'
+
+def format_compact(part, record, states=False):
+    return compact_output.jsonl_record(record, part1.board_3x3, 1 if part == 1 else 3, states)
+
+def format_binary(part, record):
+    return compact_output.binary_record(record, part1.board_3x3, 1 if part == 1 else 3)
+
+def binary_header(part):
+    return compact_output.binary_header(part1.board_3x3, 1 if part == 1 else 3)
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Solves many puzzles of part1 or part2 on a process pool.')
+    parser.add_argument('part', type=int, choices=(1, 2))
+    parser.add_argument('sources', nargs='+', help="directories, glob patterns or files of puzzles, or '-' for JSONL on stdin")
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes (default: number of CPUs)')
+    parser.add_argument('--chunk-size', type=int, default=1, help='puzzles sent to a worker at once')
+    parser.add_argument('--order', choices=('input', 'completion'), default='input')
+    parser.add_argument('--format', choices=('text', 'jsonl', 'compact', 'binary'), default='text')
+    parser.add_argument('--states', action='store_true', help='with --format compact, also write the states along the paths')
+    parser.add_argument('--output-dir', help='write every result to its own file in this directory instead of stdout')
+    parser.add_argument('--timeout', type=float, default=None, help='seconds allowed per puzzle')
+    parser.add_argument('--memory', type=int, default=None, help='memory cap of every worker in MB')
+    args = parser.parse_args()
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+    formatter = {'text': format_text, 'jsonl': format_jsonl, 'binary': format_binary,
+                 'compact': lambda part, record: format_compact(part, record, args.states)}[args.format]
+    binary = args.format == 'binary'
+    output_file = sys.stdout.buffer if binary else sys.stdout
+    if binary and not args.output_dir:
+        output_file.write(binary_header(args.part))
+        output_file.flush()
+    failed = 0
+    for record in solve_batch(args.part, read_puzzles(args.part, args.sources), args.workers, args.chunk_size,
+                              args.order, args.timeout, args.memory):
+        if record['status'] != 'ok':
+            failed += 1
+        output = formatter(args.part, record)
+        if args.output_dir:
+            with open(os.path.join(args.output_dir, output_name(record['id'])), 'wb' if binary else 'w') as file:
+                file.write(binary_header(args.part) + output if binary else output)
+            continue
+        if args.format == 'text':
+            output = '==> ' + record['id'] + ' <==\n' + output
+        output_file.write(output)
+        output_file.flush()
+    exit(1 if failed else 0)
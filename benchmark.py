@@ -0,0 +1,209 @@
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import distance_oracle
+import part1
+import part2
+
+# Benchmarks of the searches of part1 and part2 on seeded random instances. The instances are generated at exact optimal depths with the
+# distance oracles (see distance_oracle.py), so the same seed always gives the same puzzles and the optimal algorithms can be checked too.
+# Every algorithm solves all of its instances in a fresh process, whose wall time, expanded nodes and peak resident memory are recorded.
+#
+#   python3 benchmark.py            runs the suites and compares them with benchmark_baseline.json, exits with 1 on a regression
+#   python3 benchmark.py --save     runs the suites and stores them as the new baseline
+#   python3 benchmark.py --check-optimal    only checks the path costs of every optimal algorithm against the oracles
+#
+# A regression is a throughput (expanded nodes per CPU second) lower than the baseline by more than the threshold, a different number of
+# expanded nodes, or a path that is not optimal for an optimal algorithm. Timings depend on the machine, so the baseline should be saved
+# again on the machine it is compared on.
+#
+# The other optimal algorithms of the parts have no timed suite, but the comparison also solves seeded instances with each of them and
+# checks the path costs against the oracles, so a search that stops being optimal is a regression too.
+
+suites = (('part1', 'bfs'), ('part1', 'dfs'), ('part1', 'ucs'), ('part1', 'greedy'), ('part1', 'astar'), ('part2', 'astar'))
+optimal_algorithms = ('bfs', 'ucs', 'astar')
+
+# The optimal algorithms whose path costs are checked, with the options given to solve, and the optimal depths of their instances.
+optimal_checks = (('part1', 'bfs', {}), ('part1', 'ucs', {}), ('part1', 'astar', {}), ('part1', 'astar', {'heuristic': 'pattern_database'}),
+                  ('part1', 'bidirectional_bfs', {}), ('part1', 'bidirectional_astar', {}), ('part1', 'lean_astar', {}), ('part1', 'iddfs', {}),
+                  ('part1', 'hda_star', {'workers': 2}),
+                  ('part2', 'astar', {}), ('part2', 'astar', {'heuristic': 'pattern_database'}), ('part2', 'bidirectional_bfs', {}),
+                  ('part2', 'bidirectional_astar', {}), ('part2', 'ida_star', {}), ('part2', 'lean_astar', {}), ('part2', 'hda_star', {'workers': 2}))
+check_depths = {'part1': [0, 7, 14, 21], 'part2': [0, 6, 12, 18]}
+
+# The optimal depths of the instances of every suite. The informed searches get deeper instances, so they run long enough to be timed.
+default_settings = {'seed': 480, 'count': 3, 'depths': {'part1 bfs': [8, 14, 20], 'part1 dfs': [8, 14, 20], 'part1 ucs': [8, 14, 20],
+                                                        'part1 greedy': [20, 24, 28], 'part1 astar': [20, 24, 28], 'part2 astar': [12, 18, 21]}}
+
+default_baseline = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+
+
+def oracle_of(part):
+    return distance_oracle.one_blank_oracle() if part == 'part1' else distance_oracle.three_blank_oracle()
+
+# A state at the given optimal depth: starting from the goal, every step moves to a random neighbor one step further from the goal.
+# The walk starts over if it gets to a state with no neighbor further away.
+def random_instance(oracle, depth, random_generator):
+    while True:
+        state = oracle.problem.goal
+        for distance in range(1, depth + 1):
+            farther = [next_state for action, next_state in oracle.problem.successors(state) if oracle.distance(next_state) == distance]
+            if not farther:
+                break
+            state = random_generator.choice(farther)
+        else:
+            return state
+
+# count instances for every depth, as (depth, packed state) pairs.
+def generate_instances(part, depths, count, seed):
+    oracle = oracle_of(part)
+    random_generator = random.Random(str(seed) + part)
+    return [(depth, random_instance(oracle, depth, random_generator)) for depth in depths for number in range(count)]
+
+
+# Runs in its own process, so the peak resident memory is the one of this suite only. The throughput is measured on the CPU time of the
+# process, which other processes on the machine disturb much less than the wall time. The instances are solved again until min_seconds
+# of CPU time have passed, so the quick suites are timed over enough work too; the records are the ones of the first round.
+def run_suite(part, algorithm, instances, min_seconds=1.0):
+    module = part1 if part == 'part1' else part2
+    records = []
+    rounds = 0
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    while rounds == 0 or time.process_time() - cpu_start < min_seconds:
+        for depth, state in instances:
+            instance_start = time.perf_counter()
+            result = module.solve(state, algorithm)
+            if rounds == 0:
+                records.append({'state': part1.unpack_state(state), 'depth': depth, 'expanded_nodes': result.expanded_nodes,
+                                'path_cost': result.path_cost, 'seconds': time.perf_counter() - instance_start})
+        rounds += 1
+    cpu_seconds = (time.process_time() - cpu_start) / rounds
+    seconds = (time.perf_counter() - start) / rounds
+    expanded_nodes = sum(record['expanded_nodes'] for record in records)
+    return {'seconds': seconds, 'cpu_seconds': cpu_seconds, 'rounds': rounds, 'expanded_nodes': expanded_nodes,
+            'nodes_per_second': expanded_nodes / cpu_seconds, 'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            'instances': records}
+
+# Runs every suite repeat times and keeps the fastest run of each, since a slower run only measures the noise of the machine.
+def run_benchmarks(settings, repeat=1, selected=None):
+    results = {}
+    for part, algorithm in suites:
+        name = part + ' ' + algorithm
+        if selected and name not in selected:
+            continue
+        instances = generate_instances(part, settings['depths'][name], settings['count'], settings['seed'])
+        for run in range(repeat):
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+                result = executor.submit(run_suite, part, algorithm, instances).result()
+            if name not in results or result['cpu_seconds'] < results[name]['cpu_seconds']:
+                results[name] = result
+        print_result(name, results[name])
+    return results
+
+
+def print_result(name, result):
+    print(name.ljust(14) + str(result['expanded_nodes']).rjust(10) + ' nodes' + ('%.3f' % result['seconds']).rjust(10) + ' s'
+          + ('%.3f' % result['cpu_seconds']).rjust(10) + ' s cpu'
+          + ('%.0f' % result['nodes_per_second']).rjust(10) + ' nodes/s' + ('%.1f' % (result['peak_rss_kb'] / 1024)).rjust(9) + ' MB')
+    sys.stdout.flush()
+
+# Solves count instances of every depth of check_depths with each algorithm of optimal_checks and returns the path costs that are not the
+# ones of the oracles, as messages. Instances at depth 0 are the goal itself, and the unsolvable ones must give no path.
+def check_optimal(seed, count):
+    problems = []
+    for part in ('part1', 'part2'):
+        module = part1 if part == 'part1' else part2
+        oracle = oracle_of(part)
+        instances = generate_instances(part, check_depths[part], count, seed)
+        if part == 'part1':
+            instances.append((None, part1.pack_state('123456870')))
+        for check_part, algorithm, options in optimal_checks:
+            if check_part != part:
+                continue
+            name = part + ' ' + algorithm + ''.join(' ' + str(value) for value in options.values())
+            start = time.perf_counter()
+            for depth, state in instances:
+                path_cost = module.solve(state, algorithm, **options).path_cost
+                if path_cost != oracle.distance(state):
+                    problems.append(name + ': path cost ' + str(path_cost) + ' is not the optimal ' + str(oracle.distance(state))
+                                    + ' for ' + part1.unpack_state(state))
+            print(name.ljust(36) + str(len(instances)).rjust(4) + ' instances' + ('%.3f' % (time.perf_counter() - start)).rjust(10) + ' s')
+            sys.stdout.flush()
+    return problems
+
+# The problems of the results compared with the baseline, as messages. An empty list means there is no regression.
+def compare(results, baseline, threshold):
+    problems = []
+    for name, result in results.items():
+        part, algorithm = name.split()
+        oracle = oracle_of(part)
+        for record in result['instances']:
+            if algorithm in optimal_algorithms and record['path_cost'] != oracle.distance(part1.pack_state(record['state'])):
+                problems.append(name + ': path cost ' + str(record['path_cost']) + ' is not optimal for ' + record['state'])
+        expected = baseline['results'].get(name)
+        if expected is None:
+            continue
+        if result['expanded_nodes'] != expected['expanded_nodes']:
+            problems.append(name + ': ' + str(result['expanded_nodes']) + ' expanded nodes, the baseline has ' + str(expected['expanded_nodes']))
+        change = result['nodes_per_second'] / expected['nodes_per_second'] - 1
+        print(name.ljust(14) + ('%+.1f%%' % (change * 100)).rjust(8) + ' throughput')
+        if change < -threshold:
+            problems.append(name + ': throughput dropped by ' + ('%.1f%%' % (-change * 100)) + ' (threshold ' + ('%.0f%%' % (threshold * 100)) + ')')
+    return problems
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Benchmarks the searches of part1 and part2 and compares them with a stored baseline.')
+    parser.add_argument('--baseline', default=default_baseline, help='baseline file (default: benchmark_baseline.json)')
+    parser.add_argument('--save', action='store_true', help='store the results as the new baseline instead of comparing them')
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed drop of throughput as a fraction (default: 0.25)')
+    parser.add_argument('--repeat', type=int, default=3, help='runs of every suite, the fastest one is kept (default: 3)')
+    parser.add_argument('--suite', action='append', help="only run the given suite, like 'part1 astar' (can be repeated)")
+    parser.add_argument('--seed', type=int, help='seed of the instances when saving (default: %d)' % default_settings['seed'])
+    parser.add_argument('--count', type=int, help='instances per depth when saving (default: %d)' % default_settings['count'])
+    parser.add_argument('--check-optimal', action='store_true', help='only check the path costs of the optimal algorithms')
+    args = parser.parse_args()
+
+    if args.check_optimal:
+        problems = check_optimal(default_settings['seed'] if args.seed is None else args.seed, args.count or 2)
+        for problem in problems:
+            print("Regression: " + problem)
+        exit(1 if problems else 0)
+
+    # The comparison runs on the instances of the baseline, so only a new baseline can change them.
+    if args.save:
+        settings = dict(default_settings)
+        if args.seed is not None:
+            settings['seed'] = args.seed
+        if args.count is not None:
+            settings['count'] = args.count
+    else:
+        if not os.path.exists(args.baseline):
+            print("No baseline at " + args.baseline + ", run with --save first.")
+            exit(1)
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        settings = baseline['settings']
+
+    results = run_benchmarks(settings, args.repeat, args.suite)
+
+    if args.save:
+        with open(args.baseline, 'w') as file:
+            json.dump({'settings': settings, 'results': results}, file, indent=1)
+            file.write('\n')
+        print("Baseline written to " + args.baseline)
+        exit(0)
+
+    problems = compare(results, baseline, args.threshold) + check_optimal(settings['seed'], 2)
+    for problem in problems:
+        print("Regression: " + problem)
+    exit(1 if problems else 0)
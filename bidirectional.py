@@ -0,0 +1,136 @@
+import heapq
+import sys
+
+from path_result import Path_Result
+
+# Bidirectional searches for part1 and part2. A forward search grows from the initial state and a backward search grows from the goal,
+# and the solution is found where they meet. Every move can be undone in both puzzles, so the backward search uses the same successors.
+# They only need problem.initial, problem.goal and problem.successors(state), so the same code serves the 8-puzzle and the 3-blank puzzle.
+#
+# The states reached by each side are kept in a dictionary from state to (path cost, parent state), where the parent of a backward state is
+# its neighbor one step closer to the goal. The expanded nodes are reported as the number of states in both dictionaries, which is the
+# same explored + queue count the other searches report.
+
+
+# The first action in the priority order that leads from state to next_state. Only used while building the path, so the searches
+# themselves never have to invert actions.
+def action_between(problem, state, next_state):
+    for action, successor in problem.successors(state):
+        if successor == next_state:
+            return action
+
+# Joins the forward path to the meeting state and the backward path from it to the goal into one list of actions.
+def build_path(problem, meeting_state, forward, backward):
+    states = []
+    state = meeting_state
+    while state is not None:
+        states.append(state)
+        state = forward[state][1]
+    states.reverse()
+    state = backward[meeting_state][1]
+    while state is not None:
+        states.append(state)
+        state = backward[state][1]
+    return [action_between(problem, states[i], states[i + 1]) for i in range(len(states) - 1)]
+
+
+# Bidirectional breadth-first search. The side with the smaller frontier expands one whole layer at a time. When a layer touches the other
+# side, the layer is finished and the cheapest meeting is taken; since every state of both frontiers is at its exact depth, no shorter
+# path can be found later.
+def bidirectional_bfs(problem):
+    if problem.goal_test(problem.initial):
+        return Path_Result([], 0)
+    forward = {problem.initial: (0, None)}
+    backward = {problem.goal: (0, None)}
+    forward_layer = [problem.initial]
+    backward_layer = [problem.goal]
+    while forward_layer and backward_layer:
+        if len(forward_layer) <= len(backward_layer):
+            this_side, other_side, layer = forward, backward, forward_layer
+        else:
+            this_side, other_side, layer = backward, forward, backward_layer
+        best_cost = None
+        meeting_state = None
+        next_layer = []
+        for state in layer:
+            path_cost = this_side[state][0] + 1
+            for action, next_state in problem.successors(state):
+                if next_state in this_side:
+                    continue
+                this_side[next_state] = (path_cost, state)
+                next_layer.append(next_state)
+                if next_state in other_side:
+                    cost = path_cost + other_side[next_state][0]
+                    if best_cost is None or cost < best_cost:
+                        best_cost = cost
+                        meeting_state = next_state
+        if meeting_state is not None:
+            return Path_Result(build_path(problem, meeting_state, forward, backward), len(forward) + len(backward))
+        if this_side is forward:
+            forward_layer = next_layer
+        else:
+            backward_layer = next_layer
+    return Path_Result(None, len(forward) + len(backward))
+
+
+# Bidirectional heuristic search meeting in the middle (MM). Each side orders its fringe by max(g + h, 2g), where h estimates the distance
+# to the other end, so neither side goes past the middle of an optimal path before the other side has reached it. U is the cost of the
+# best meeting found so far. Once U is not larger than the smallest priority of both fringes, no cheaper meeting exists and the search stops.
+# forward_heuristic estimates the distance to the goal and backward_heuristic the distance to the initial state; both must be admissible.
+def bidirectional_astar(problem, forward_heuristic, backward_heuristic):
+    if problem.goal_test(problem.initial):
+        return Path_Result([], 0)
+    forward = {problem.initial: (0, None)}
+    backward = {problem.goal: (0, None)}
+    forward_fringe = [(forward_heuristic(problem.initial), 0, problem.initial)]
+    backward_fringe = [(backward_heuristic(problem.goal), 0, problem.goal)]
+    best_cost = None
+    meeting_state = None
+    while True:
+        # Entries whose state was reached again with a lower path cost are skipped.
+        for fringe, this_side in ((forward_fringe, forward), (backward_fringe, backward)):
+            while fringe and fringe[0][1] != this_side[fringe[0][2]][0]:
+                heapq.heappop(fringe)
+        if not forward_fringe or not backward_fringe:
+            break
+        if best_cost is not None and best_cost <= min(forward_fringe[0][0], backward_fringe[0][0]):
+            break
+        if forward_fringe[0][0] <= backward_fringe[0][0]:
+            fringe, this_side, other_side, heuristic = forward_fringe, forward, backward, forward_heuristic
+        else:
+            fringe, this_side, other_side, heuristic = backward_fringe, backward, forward, backward_heuristic
+        priority, path_cost, state = heapq.heappop(fringe)
+        path_cost += 1
+        for action, next_state in problem.successors(state):
+            reached = this_side.get(next_state)
+            if reached is not None and reached[0] <= path_cost:
+                continue
+            this_side[next_state] = (path_cost, state)
+            heapq.heappush(fringe, (max(path_cost + heuristic(next_state), 2 * path_cost), path_cost, next_state))
+            if next_state in other_side:
+                cost = path_cost + other_side[next_state][0]
+                if best_cost is None or cost < best_cost:
+                    best_cost = cost
+                    meeting_state = next_state
+    if meeting_state is None:
+        return Path_Result(None, len(forward) + len(backward))
+    return Path_Result(build_path(problem, meeting_state, forward, backward), len(forward) + len(backward))
+
+
+if __name__ == '__main__':
+
+    # Writes the results of both bidirectional searches in the same format as the output file of part1.py, for comparing them with
+    # the results of the other algorithms.
+    if len(sys.argv) != 4 or sys.argv[1] not in ('1', '2'):
+        print("Usage: python bidirectional.py <1|2> <input_file> <output_file>")
+        exit(1)
+
+    import part1
+    import part2
+
+    part = part1 if sys.argv[1] == '1' else part2
+    input_state = part.read_input(sys.argv[2])
+    results = [('Bidirectional BFS', part.solve(input_state, 'bidirectional_bfs')),
+               ('Bidirectional A*', part.solve(input_state, 'bidirectional_astar'))]
+    with open(sys.argv[3], 'w') as file:
+        part1.write_output(file, results)
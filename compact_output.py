@@ -0,0 +1,158 @@
+import base64
+import json
+import struct
+
+from sliding_puzzle import action_priority
+
+# Compact, machine-readable results for solving many puzzles, next to the text format of the output files. The actions of a path are
+# packed as 2-bit codes (the action priorities, U=0 R=1 D=2 L=3), and for the puzzles with more blanks the index of the blank follows in
+# as many bits as the largest cell index needs (4 bits on the 3x3 board). So an 8-puzzle path takes a byte per four actions.
+# The states along the path are only written when they are asked for.
+#
+# Both formats take the records of batch.py: {'id', 'status', 'state', 'results': [{'algorithm', 'expanded_nodes', 'path_cost', 'actions'}]}
+# for part1, and the same with a single result in the record itself for part2.
+#
+#   jsonl   one JSON object per record, the packed actions in base64 with their count in 'path_cost'
+#   binary  a header with the board and the number of blanks, then every record as
+#             id length (uint16), id, status (uint8), state (as many bytes as the board needs, 5 on the 3x3 board, 0 if the input could not
+#             be read),
+#             result count (uint8) or error length (uint16) and error,
+#             and per result: algorithm (uint8, index in algorithm_names), expanded nodes (uint32), path cost (uint32), packed actions
+#           all little-endian. read_binary gives the records back.
+
+digits = '0123456789abcdefghijklmnopqrstuvwxyz'
+actions_by_code = 'URDL'
+algorithm_names = ('BFS', 'DFS', 'UCS', 'Greedy', 'A*')
+statuses = ('ok', 'timeout', 'memory', 'error')
+
+magic = b'SPZ2'
+header_format = struct.Struct('<4sBBB')  # Magic, rows, columns, number of blanks.
+result_format = struct.Struct('<BII')
+NO_PATH = 0xFFFFFFFF
+
+
+# The state as one character per cell, the form Board.parse reads back.
+def state_text(board, state):
+    return ''.join(digits[value] for value in board.unpack(state))
+
+# Bytes of a state in the binary format, enough for every cell of the board.
+def state_bytes(board):
+    return (board.bits * board.cells + 7) // 8
+
+# Bits of a packed action: the action code, and the index of the blank when there is more than one.
+def action_bits(board, blank_count):
+    return 2 if blank_count == 1 else 2 + (board.cells - 1).bit_length()
+
+def encode_actions(actions, board, blank_count):
+    bits = action_bits(board, blank_count)
+    packed = 0
+    for position, action in enumerate(actions):
+        if blank_count == 1:
+            code = action_priority[action]
+        else:
+            code = action_priority[action[0]] | action[1] << 2
+        packed |= code << (position * bits)
+    return packed.to_bytes((len(actions) * bits + 7) // 8, 'little')
+
+def decode_actions(data, count, board, blank_count):
+    bits = action_bits(board, blank_count)
+    packed = int.from_bytes(data, 'little')
+    mask = (1 << bits) - 1
+    actions = []
+    for position in range(count):
+        code = (packed >> (position * bits)) & mask
+        if blank_count == 1:
+            actions.append(actions_by_code[code & 3])
+        else:
+            actions.append([actions_by_code[code & 3], code >> 2])
+    return actions
+
+# The states along the path, the initial one included, as state_text strings.
+def path_states(board, state, actions):
+    states = [state_text(board, state)]
+    for action in actions:
+        state = board.result(state, action[0], action[1]) if isinstance(action, list) else board.result(state, action)
+        states.append(state_text(board, state))
+    return states
+
+# The results of a record, for part1 and part2 alike.
+def record_results(record):
+    if 'results' in record:
+        return record['results']
+    return [dict(algorithm='A*', expanded_nodes=record['expanded_nodes'], path_cost=record['path_cost'], actions=record['actions'])]
+
+
+def jsonl_record(record, board, blank_count, states=False):
+    state = None if record['state'] is None else state_text(board, record['state'])
+    compact = {'id': record['id'], 'status': record['status'], 'state': state}
+    if record['status'] != 'ok':
+        compact['error'] = record['error']
+        return json.dumps(compact) + '\n'
+    results = []
+    for result in record_results(record):
+        packed = {'algorithm': result['algorithm'], 'expanded_nodes': result['expanded_nodes'], 'path_cost': result['path_cost'],
+                  'actions': base64.b64encode(encode_actions(result['actions'], board, blank_count)).decode('ascii')}
+        if states:
+            packed['states'] = path_states(board, record['state'], result['actions'])
+        results.append(packed)
+    compact['results'] = results
+    return json.dumps(compact) + '\n'
+
+# The packed actions of a jsonl result back as a list.
+def jsonl_actions(result, board, blank_count):
+    return decode_actions(base64.b64decode(result['actions']), result['path_cost'], board, blank_count)
+
+
+def binary_header(board, blank_count):
+    return header_format.pack(magic, board.rows, board.cols, blank_count)
+
+def binary_record(record, board, blank_count):
+    puzzle_id = record['id'].encode('utf-8')
+    data = [struct.pack('<H', len(puzzle_id)), puzzle_id, struct.pack('<B', statuses.index(record['status'])),
+            (record['state'] or 0).to_bytes(state_bytes(board), 'little')]
+    if record['status'] != 'ok':
+        error = record['error'].encode('utf-8')
+        data.append(struct.pack('<H', len(error)))
+        data.append(error)
+        return b''.join(data)
+    results = record_results(record)
+    data.append(struct.pack('<B', len(results)))
+    for result in results:
+        path_cost = NO_PATH if result['path_cost'] is None else result['path_cost']
+        data.append(result_format.pack(algorithm_names.index(result['algorithm']), result['expanded_nodes'], path_cost))
+        data.append(encode_actions(result['actions'] or [], board, blank_count))
+    return b''.join(data)
+
+# Yields the records of a binary file in the form of batch.py, with every record's results in 'results'. board_type is the class
+# of the board, e.g. sliding_puzzle.Board, so the reader does not depend on the part that wrote the file.
+def read_binary(file, board_type):
+    header = file.read(header_format.size)
+    name, rows, cols, blank_count = header_format.unpack(header)
+    if name != magic:
+        raise ValueError('not a binary result file')
+    board = board_type(rows, cols)
+    bits = action_bits(board, blank_count)
+    while True:
+        length = file.read(2)
+        if not length:
+            return
+        puzzle_id = file.read(struct.unpack('<H', length)[0]).decode('utf-8')
+        status = file.read(1)[0]
+        state = int.from_bytes(file.read(state_bytes(board)), 'little')
+        record = {'id': puzzle_id, 'status': statuses[status], 'state': state}
+        if statuses[status] != 'ok':
+            record['error'] = file.read(struct.unpack('<H', file.read(2))[0]).decode('utf-8')
+            yield record
+            continue
+        results = []
+        for number in range(file.read(1)[0]):
+            algorithm, expanded_nodes, path_cost = result_format.unpack(file.read(result_format.size))
+            if path_cost == NO_PATH:
+                path_cost = None
+            count = path_cost or 0
+            actions = decode_actions(file.read((count * bits + 7) // 8), count, board, blank_count)
+            results.append({'algorithm': algorithm_names[algorithm], 'expanded_nodes': expanded_nodes, 'path_cost': path_cost,
+                            'actions': actions if path_cost is not None else None})
+        record['results'] = results
+        yield record
+
@@ -0,0 +1,233 @@
+import argparse
+import heapq
+import json
+import mmap
+import os
+import time
+
+from sliding_puzzle import Board
+
+# Breadth-first search with the layers on disk, for the boards and numbers of blanks whose states do not fit in memory. Every layer is a
+# file of packed states, sorted and without duplicates, each state taking the same number of bytes in big-endian order. The files are
+# memory-mapped and read in order, so the RAM in use is the budget for the children of the layer being expanded and not the state space.
+#
+# The children of a layer are collected in memory until the budget is full, then sorted and written as a run. When the whole layer has
+# been expanded, the runs are merged into the next layer, and the duplicates are dropped in the same streaming pass: the moves can all be
+# undone, so a child that is not new is in the layer it came from or in the one before it, and those two files are merged against too.
+#
+# After every layer, a checkpoint with the layers done so far is written to the directory, so a run that was stopped can be resumed from
+# the last complete layer. Every layer also records its number of states, the runs it needed and the bytes read and written with their
+# throughput, which is what sizing a larger run takes.
+#
+#   python3 disk_bfs.py <directory> [--board 4x4] [--blanks N] [--state S] [--goal G] [--memory MB] [--max-depth N] [--resume] [--keep-layers]
+
+checkpoint_name = 'checkpoint.json'
+
+# Bytes a state takes in the memory budget while its run is collected and sorted: the integer object and the slot of the list.
+state_overhead = 48
+
+
+class Disk_BFS:
+
+    def __init__(self, board, directory, memory_mb=64, keep_layers=False):
+        self.board = board
+        self.directory = directory
+        self.width = (board.bits * board.cells + 7) // 8  # Bytes per state in the files.
+        self.run_size = max(memory_mb * 1024 * 1024 // (state_overhead + self.width), 1)  # States per run.
+        self.keep_layers = keep_layers
+        self.bytes_read = 0
+        self.bytes_written = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def layer_name(self, depth):
+        return 'layer_%04d.bin' % depth
+
+    # The states of a layer or run file in order.
+    def read(self, name):
+        path = self.path(name)
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if size == 0:
+            return
+        width = self.width
+        with open(path, 'rb') as file:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                for offset in range(0, size, width):
+                    yield int.from_bytes(data[offset:offset + width], 'big')
+            finally:
+                self.bytes_read += size
+                data.close()
+
+    # Writes the states, which must be in order, and returns their number. The file is written under a temporary name first, so a file
+    # with its final name is always complete.
+    def write(self, name, states):
+        width = self.width
+        count = 0
+        buffer = bytearray()
+        temporary_path = self.path(name + '.tmp')
+        with open(temporary_path, 'wb') as file:
+            for state in states:
+                buffer += state.to_bytes(width, 'big')
+                count += 1
+                if len(buffer) >= 1 << 20:
+                    file.write(buffer)
+                    self.bytes_written += len(buffer)
+                    buffer = bytearray()
+            file.write(buffer)
+            self.bytes_written += len(buffer)
+        os.replace(temporary_path, self.path(name))
+        return count
+
+    # The children of every state of the layer, as sorted runs without duplicates. Returns the names of the runs and the number of children.
+    def expand(self, depth):
+        board = self.board
+        runs = []
+        children = []
+        generated = 0
+        for state in self.read(self.layer_name(depth)):
+            for action, priority, index, target, next_blanks in board.sliding_moves(board.blank_indices(state)):
+                children.append(board.move(state, index, target))
+            if len(children) >= self.run_size:
+                generated += len(children)
+                runs.append(self.write_run(depth + 1, len(runs), children))
+                children = []
+        if children or not runs:
+            generated += len(children)
+            runs.append(self.write_run(depth + 1, len(runs), children))
+        return runs, generated
+
+    def write_run(self, depth, number, children):
+        name = 'layer_%04d.run_%04d' % (depth, number)
+        self.write(name, unique(sorted(children)))
+        return name
+
+    # The states of the merged runs that are in none of the previous layers, in order.
+    def new_states(self, runs, depth):
+        previous = [self.read(self.layer_name(depth - 1)) if depth >= 1 else iter(()), self.read(self.layer_name(depth))]
+        heads = [next(states, None) for states in previous]
+        for state in unique(heapq.merge(*[self.read(run) for run in runs])):
+            seen = False
+            for number in range(2):
+                while heads[number] is not None and heads[number] < state:
+                    heads[number] = next(previous[number], None)
+                if heads[number] == state:
+                    seen = True
+            if not seen:
+                yield state
+
+    def load_checkpoint(self):
+        path = self.path(checkpoint_name)
+        if not os.path.exists(path):
+            return None
+        with open(path) as file:
+            return json.load(file)
+
+    def save_checkpoint(self, checkpoint):
+        temporary_path = self.path(checkpoint_name + '.tmp')
+        with open(temporary_path, 'w') as file:
+            json.dump(checkpoint, file, indent=1)
+        os.replace(temporary_path, self.path(checkpoint_name))
+
+    # Removes the files of the layers after the checkpoint, left by a run that was stopped in the middle of a layer.
+    def remove_partial_files(self, depth):
+        for name in os.listdir(self.directory):
+            if name.startswith('layer_') and int(name[6:10]) > depth:
+                os.remove(self.path(name))
+
+    # Searches from the start state until the goal is found, max_depth is reached or there are no new states, and returns the checkpoint,
+    # whose 'layers' are the records of all the layers. With a goal, 'distance' is its optimal path cost once it is found.
+    # With resume, the search continues from the checkpoint in the directory, which must be one of the same search.
+    def run(self, start, goal=None, max_depth=None, resume=False):
+        search = {'board': [self.board.rows, self.board.cols], 'start': format(start, 'x'), 'goal': None if goal is None else format(goal, 'x')}
+        checkpoint = self.load_checkpoint() if resume else None
+        if checkpoint is not None:
+            if checkpoint['search'] != search:
+                raise ValueError('the checkpoint in ' + self.directory + ' is of another search')
+        else:
+            self.remove_partial_files(-1)
+            self.write(self.layer_name(0), [start])
+            checkpoint = {'search': search, 'depth': 0, 'distance': 0 if start == goal else None, 'done': start == goal,
+                          'layers': [{'depth': 0, 'states': 1, 'generated': 0, 'runs': 0, 'bytes_read': 0, 'bytes_written': self.width,
+                                      'seconds': 0.0, 'read_mb_per_second': 0.0, 'write_mb_per_second': 0.0}]}
+            self.save_checkpoint(checkpoint)
+        self.remove_partial_files(checkpoint['depth'])
+        while not checkpoint['done'] and (max_depth is None or checkpoint['depth'] < max_depth):
+            depth = checkpoint['depth']
+            start_time = time.perf_counter()
+            self.bytes_read = 0
+            self.bytes_written = 0
+            runs, generated = self.expand(depth)
+            found = []
+
+            def check_goal(states):
+                for state in states:
+                    if state == goal:
+                        found.append(state)
+                    yield state
+            count = self.write(self.layer_name(depth + 1), check_goal(self.new_states(runs, depth)))
+            for run in runs:
+                os.remove(self.path(run))
+            seconds = time.perf_counter() - start_time
+            checkpoint['layers'].append({'depth': depth + 1, 'states': count, 'generated': generated, 'runs': len(runs),
+                                         'bytes_read': self.bytes_read, 'bytes_written': self.bytes_written, 'seconds': seconds,
+                                         'read_mb_per_second': self.bytes_read / seconds / 1e6 if seconds else 0.0,
+                                         'write_mb_per_second': self.bytes_written / seconds / 1e6 if seconds else 0.0})
+            if count == 0:
+                os.remove(self.path(self.layer_name(depth + 1)))
+                checkpoint['done'] = True
+            else:
+                checkpoint['depth'] = depth + 1
+            if found:
+                checkpoint['distance'] = depth + 1
+                checkpoint['done'] = True
+            self.save_checkpoint(checkpoint)
+            if not self.keep_layers and depth >= 1:
+                os.remove(self.path(self.layer_name(depth - 1)))
+        return checkpoint
+
+
+# The values of sorted values without the repeated ones.
+def unique(values):
+    last = None
+    for value in values:
+        if value != last:
+            yield value
+            last = value
+
+
+def print_layer(layer):
+    print(str(layer['depth']).rjust(5) + str(layer['states']).rjust(12) + str(layer['runs']).rjust(6)
+          + ('%.1f' % (layer['bytes_read'] / 1e6)).rjust(10) + ('%.1f' % (layer['bytes_written'] / 1e6)).rjust(10)
+          + ('%.1f' % layer['read_mb_per_second']).rjust(10) + ('%.1f' % layer['write_mb_per_second']).rjust(10) + ('%.2f' % layer['seconds']).rjust(9))
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Breadth-first search with the layers on disk.')
+    parser.add_argument('directory', help='directory of the layer files and the checkpoint')
+    parser.add_argument('--board', default='3x3', help='rows x columns of the board (default: 3x3)')
+    parser.add_argument('--blanks', type=int, default=1, help='number of blanks when no state is given (default: 1)')
+    parser.add_argument('--state', help='start state (default: the goal, to go over every reachable state)')
+    parser.add_argument('--goal', help='stop when this state is reached and print its distance')
+    parser.add_argument('--memory', type=int, default=64, help='memory budget of the children in MB (default: 64)')
+    parser.add_argument('--max-depth', type=int, default=None, help='stop after this layer')
+    parser.add_argument('--resume', action='store_true', help='continue from the checkpoint in the directory')
+    parser.add_argument('--keep-layers', action='store_true', help='keep every layer file instead of only the last two')
+    args = parser.parse_args()
+
+    rows, cols = args.board.split('x')
+    board = Board(int(rows), int(cols))
+    start = board.parse(args.state) if args.state else board.goal_state(args.blanks)
+    goal = board.parse(args.goal) if args.goal else None
+    disk_bfs = Disk_BFS(board, args.directory, args.memory, args.keep_layers)
+    print('depth' + 'states'.rjust(12) + 'runs'.rjust(6) + 'read MB'.rjust(10) + 'write MB'.rjust(10) + 'read MB/s'.rjust(10)
+          + 'write MB/s'.rjust(10) + 'seconds'.rjust(9))
+    checkpoint = disk_bfs.run(start, goal, args.max_depth, args.resume)
+    for layer in checkpoint['layers']:
+        print_layer(layer)
+    print('Reached states: ' + str(sum(layer['states'] for layer in checkpoint['layers'])))
+    if goal is not None:
+        print('Distance: ' + str(checkpoint['distance']))
@@ -0,0 +1,198 @@
+import mmap
+import os
+import sys
+import tempfile
+from collections import deque
+from math import comb, factorial
+
+import part1
+import part2
+
+# Exact distance tables for the 8-puzzle (part1) and the 3-blank puzzle (part2). Both state spaces are small enough to be searched
+# completely, so a breadth-first search backwards from the goal gives the optimal distance of every state. The distances are stored
+# as one byte per state, indexed by the rank of the state, and the file is memory-mapped when the oracle is loaded.
+# After that, the optimal path cost is a single lookup and the path itself is found by always moving to a neighbor that is one
+# step closer to the goal, so no search is made at all.
+
+# Byte of the states that cannot reach the goal, i.e. the half of the 8-puzzle states with the wrong parity.
+UNREACHABLE = 255
+
+factorials = tuple(factorial(n) for n in range(10))
+
+
+def cell_values(state):
+    return part1.board_3x3.unpack(state)
+
+# Lehmer code of a sequence of distinct values, between 0 and len(values)! - 1.
+def permutation_rank(values):
+    rank = 0
+    length = len(values)
+    for i in range(length):
+        smaller = 0
+        for j in range(i + 1, length):
+            if values[j] < values[i]:
+                smaller += 1
+        rank += smaller * factorials[length - 1 - i]
+    return rank
+
+# Rank of a set of ascending indices in the combinatorial number system, between 0 and C(n, len(indices)) - 1.
+def combination_rank(indices):
+    return sum(comb(index, k + 1) for k, index in enumerate(indices))
+
+# The 8-puzzle states are permutations of 0..8, so they are ranked between 0 and 9! - 1.
+def rank_one_blank(state):
+    return permutation_rank(cell_values(state))
+
+# A 3-blank state is the set of blank indices (C(9, 3) = 84 choices) and the order of the six tiles (6! = 720 choices),
+# so the states are ranked between 0 and 9! / 3! - 1 = 60479.
+def rank_three_blanks(state):
+    values = cell_values(state)
+    blanks = [index for index in range(9) if values[index] == 0]
+    tiles = [value for value in values if value != 0]
+    return combination_rank(blanks) * factorials[6] + permutation_rank(tiles)
+
+
+class Distance_Oracle:
+
+    def __init__(self, problem, rank, size, path):
+        self.problem = problem  # Problem whose goal the distances are measured to. Its initial state is not used.
+        self.rank = rank  # Function that maps a packed state to its index in the table.
+        self.size = size  # Number of ranks.
+        self.path = path  # File the table is saved to.
+        self.table = None
+
+    # Breadth-first search backwards from the goal. Every move can be undone, so the neighbors of a state are also its predecessors.
+    # The distances are kept in a dictionary of packed states while searching, so each state is ranked only once at the end.
+    def build(self):
+        distances = {self.problem.goal: 0}
+        frontier = deque([self.problem.goal])
+        while frontier:
+            state = frontier.popleft()
+            distance = distances[state] + 1
+            for action, next_state in self.problem.successors(state):
+                if next_state not in distances:
+                    distances[next_state] = distance
+                    frontier.append(next_state)
+        table = bytearray([UNREACHABLE]) * self.size
+        for state, distance in distances.items():
+            table[self.rank(state)] = distance
+        # Written to a file of its own first, so processes building the same table at once do not write over each other's files and a
+        # table under the final name is always complete.
+        descriptor, temporary_path = tempfile.mkstemp(suffix='.tmp', prefix=os.path.basename(self.path) + '.',
+                                                      dir=os.path.dirname(os.path.abspath(self.path)))
+        try:
+            with os.fdopen(descriptor, 'wb') as file:
+                file.write(table)
+            os.chmod(temporary_path, 0o644)
+            os.replace(temporary_path, self.path)
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+        return len(distances)
+
+    # Memory-maps the saved table, building it first if it does not exist yet.
+    def load(self):
+        if self.table is not None:
+            return self
+        if not os.path.exists(self.path) or os.path.getsize(self.path) != self.size:
+            self.build()
+        with open(self.path, 'rb') as file:
+            self.table = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self
+
+    # The state relabeled for the goal of the oracle, see Board.relabeled. So the oracle also serves every other goal with the blanks in the
+    # same cells, and the actions it gives are the ones for that goal. Without a goal, the state is measured to the goal of the oracle.
+    def relabeled(self, state, goal=None):
+        if goal is None or goal == self.problem.goal:
+            return state
+        state, goal = self.problem.board.relabeled(state, goal)
+        if goal != self.problem.goal:
+            raise ValueError('the blanks of the goal are not where the blanks of the goal of the oracle are, see oracle_for')
+        return state
+
+    # Optimal path cost of the state, or None if the goal cannot be reached from it.
+    def distance(self, state, goal=None):
+        state = self.relabeled(state, goal)
+        distance = self.load().table[self.rank(state)]
+        return None if distance == UNREACHABLE else distance
+
+    # Optimal list of actions from the state to the goal. Among the moves that get one step closer, the first one in the
+    # action priority order is taken, so the path is deterministic. Returns None if the goal cannot be reached.
+    def solve(self, state, goal=None):
+        state = self.relabeled(state, goal)
+        distance = self.distance(state)
+        if distance is None:
+            return None
+        actions = []
+        while distance > 0:
+            for action, next_state in self.problem.successors(state):
+                if self.table[self.rank(next_state)] == distance - 1:
+                    actions.append(action)
+                    state = next_state
+                    distance -= 1
+                    break
+        return actions
+
+
+def default_path(name):
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), 'oracle_' + name + '.bin')
+
+def one_blank_oracle(path=None):
+    problem = part1.Eight_Puzzle_Problem(None, part1.pack_state("123456780"))
+    return Distance_Oracle(problem, rank_one_blank, factorials[9], path or default_path('part1'))
+
+def three_blank_oracle(path=None):
+    problem = part2.Eight_Puzzle_Problem_3_Blanks(None, part2.pack_state("123456000"))
+    return Distance_Oracle(problem, rank_three_blanks, factorials[9] // factorials[3], path or default_path('part2'))
+
+oracles = {}
+
+# The oracle of any goal of the part: the one of the goal with the same blanks and the tiles in order, which serves all those goals. The oracles
+# of the usual goals are the ones above; the tables of the other placements of the blanks are built and saved the first time they are needed.
+def oracle_for(part, goal):
+    canonical = part1.board_3x3.canonical_goal(goal)
+    if canonical not in oracles:
+        if part == 1:
+            oracle = one_blank_oracle()
+            if canonical != oracle.problem.goal:
+                oracle = Distance_Oracle(part1.Eight_Puzzle_Problem(None, canonical), rank_one_blank, factorials[9],
+                                         default_path('part1_' + format(canonical, '09x')))
+        else:
+            oracle = three_blank_oracle()
+            if canonical != oracle.problem.goal:
+                oracle = Distance_Oracle(part2.Eight_Puzzle_Problem_3_Blanks(None, canonical), rank_three_blanks, factorials[9] // factorials[3],
+                                         default_path('part2_' + format(canonical, '09x')))
+        oracles[canonical] = oracle
+    return oracles[canonical]
+
+
+if __name__ == '__main__':
+
+    # "build" (re)creates both tables. Otherwise the part number, an input file and an output file are expected, and the optimal path is
+    # written in the same format as the A* section of part1. With --check, A* is also run and its path cost is compared with the oracle.
+    if len(sys.argv) == 2 and sys.argv[1] == 'build':
+        for name, oracle in (('part1', one_blank_oracle()), ('part2', three_blank_oracle())):
+            print(name + ': ' + str(oracle.build()) + ' reachable states written to ' + oracle.path)
+        exit(0)
+    if len(sys.argv) not in (4, 5) or sys.argv[1] not in ('1', '2') or (len(sys.argv) == 5 and sys.argv[4] != '--check'):
+        print("Usage: python distance_oracle.py build")
+        print("       python distance_oracle.py <1|2> <input_file> <output_file> [--check]")
+        exit(1)
+
+    part = part1 if sys.argv[1] == '1' else part2
+    oracle = one_blank_oracle() if sys.argv[1] == '1' else three_blank_oracle()
+    input_state = part.read_input(sys.argv[2])
+    actions = oracle.solve(input_state)
+    if actions is None:
+        print("The goal cannot be reached from the given state.")
+        exit(1)
+
+    with open(sys.argv[3], 'w') as file:
+        file.write('Path cost: ' + str(len(actions)) + '\n')
+        file.write('Actions: ' + str(actions) + '\n')
+
+    if len(sys.argv) == 5:
+        astar_result = part.astar(oracle.problem.__class__(input_state, oracle.problem.goal))
+        if astar_result.path_cost != len(actions):
+            print("Mismatch: A* path cost is " + str(astar_result.path_cost) + ", oracle path cost is " + str(len(actions)))
+            exit(1)
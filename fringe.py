@@ -0,0 +1,69 @@
+import heapq
+from collections import deque
+
+# Fringes (priority queues) for the best-first searches in part1.py and part2.py. Both of them are used through put(key, item), get() and len().
+# Keys are precomputed tuples such as (f(n), action priority), so ordering an entry never looks anything up on the node itself.
+# Unlike queue.PriorityQueue, no lock is taken on put/get since the searches are single-threaded.
+
+
+# An entry of the heap. Only the key is compared, so entries with equal keys are popped in exactly the same order as
+# queue.PriorityQueue popped the nodes whose __lt__ compared the same values. This keeps the expanded node counts and paths unchanged.
+class Fringe_Entry:
+
+    __slots__ = ('key', 'item')
+
+    def __init__(self, key, item):
+        self.key = key
+        self.item = item
+
+    def __lt__(self, other):
+        return self.key < other.key
+
+
+# Binary heap backend built on heapq. This is the default fringe of all the best-first searches.
+class Heap_Fringe:
+
+    def __init__(self):
+        self.heap = []
+
+    def put(self, key, item):
+        heapq.heappush(self.heap, Fringe_Entry(key, item))
+
+    def get(self):
+        return heapq.heappop(self.heap).item
+
+    def __len__(self):
+        return len(self.heap)
+
+
+# Bucket queue backend. Every distinct key has a FIFO bucket, and only the distinct keys are kept in a heap. Since the costs are small
+# integers, there are only a few dozen distinct keys at a time and most puts and gets never touch the heap.
+# The keys are still respected exactly, but items with equal keys are popped in insertion order. So the expanded node counts may differ
+# from Heap_Fringe on ties, while the path costs of the optimal searches stay the same.
+class Bucket_Fringe:
+
+    def __init__(self):
+        self.keys = []
+        self.buckets = {}
+        self.size = 0
+
+    def put(self, key, item):
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = deque()
+            heapq.heappush(self.keys, key)
+        bucket.append(item)
+        self.size += 1
+
+    def get(self):
+        key = self.keys[0]
+        bucket = self.buckets[key]
+        item = bucket.popleft()
+        if not bucket:
+            del self.buckets[key]
+            heapq.heappop(self.keys)
+        self.size -= 1
+        return item
+
+    def __len__(self):
+        return self.size
@@ -0,0 +1,107 @@
+import heapq
+from math import perm
+
+from path_result import Path_Result
+from sliding_puzzle import action_priority
+
+# Memory-lean A* for the boards whose states can all be numbered, such as the 3x3 puzzles of part1 and part2. Instead of a node object per
+# generated state kept alive by the parent chains, the search keeps three byte tables indexed by the rank of the state: the path cost g,
+# the move that reached the state, and whether the state was explored. The fringe is a heap of plain integers, each packing f(n), the
+# action priority and the packed state, so it holds no objects besides the integers themselves. The path is rebuilt at the end by undoing
+# the recorded moves from the goal back to the initial state.
+#
+# The order of the fringe only differs from the one of the normal A* in its ties: equal (f(n), action priority) pairs are taken in the
+# order of their packed states instead of the order of the heap. So the path cost is the same optimal one, while the actions and the
+# expanded nodes can differ a little.
+
+# Byte of the states that have not been reached in the g table.
+UNSEEN = 255
+
+
+# Numbers the states of a board with the given number of blanks, between 0 and cells! / blanks! - 1. The positions of the tiles 1, 2, ...
+# in order are ranked as a partial permutation of the cells: the blanks are where the tiles are not, so they need no rank of their own.
+class State_Ranker:
+
+    def __init__(self, board, blank_count):
+        self.shifts = board.shifts
+        self.mask = board.mask
+        self.cells = board.cells
+        self.tiles = board.cells - blank_count
+        self.size = perm(self.cells, self.tiles)
+
+    def rank(self, state):
+        positions = [0] * (self.cells + 1)
+        index = 0
+        for shift in self.shifts:
+            positions[(state >> shift) & self.mask] = index
+            index += 1
+        rank = 0
+        used = 0
+        radix = self.cells
+        for tile in range(1, self.tiles + 1):
+            position = positions[tile]
+            rank = rank * radix + position - (used & ((1 << position) - 1)).bit_count()
+            used |= 1 << position
+            radix -= 1
+        return rank
+
+
+# heuristic(state) is the heuristic of the initial state, and heuristic_delta(state, next_state, index, target) the change of the heuristic
+# when the tile at target slides into the blank at index, as in the normal A* of each part. max_size limits the tables (three bytes per rank).
+def lean_astar(problem, heuristic, heuristic_delta, max_size=1 << 26):
+    board = problem.board
+    ranker = State_Ranker(board, problem.blank_count)
+    if ranker.size > max_size:
+        raise ValueError('the states of a ' + str(board.rows) + 'x' + str(board.cols) + ' board are too many to be numbered')
+    rank = ranker.rank
+    path_costs = bytearray([UNSEEN]) * ranker.size
+    came_from = bytearray(ranker.size)  # index * 4 + action priority of the move that reached the state.
+    explored = bytearray(ranker.size)
+    state_bits = board.bits * board.cells
+    state_mask = (1 << state_bits) - 1
+    move = board.move
+    sliding_moves = board.sliding_moves
+    blank_indices = board.blank_indices
+
+    initial = problem.initial
+    path_costs[rank(initial)] = 0
+    reached = 1
+    fringe = [(heuristic(initial) << 2) << state_bits | initial]
+    while fringe:
+        entry = heapq.heappop(fringe)
+        state = entry & state_mask
+        state_rank = rank(state)
+        if explored[state_rank]:
+            continue
+        explored[state_rank] = 1
+        if state == problem.goal:
+            return Path_Result(rebuild_path(problem, ranker, came_from, state), reached)
+        path_cost = path_costs[state_rank]
+        state_heuristic = (entry >> (state_bits + 2)) - path_cost
+        next_cost = path_cost + 1
+        for action, priority, index, target, next_blanks in sliding_moves(blank_indices(state)):
+            next_state = move(state, index, target)
+            next_rank = rank(next_state)
+            if explored[next_rank] or path_costs[next_rank] <= next_cost:
+                continue
+            if path_costs[next_rank] == UNSEEN:
+                reached += 1
+            path_costs[next_rank] = next_cost
+            came_from[next_rank] = index * 4 + priority
+            next_f = next_cost + state_heuristic + heuristic_delta(state, next_state, index, target)
+            heapq.heappush(fringe, (next_f << 2 | priority) << state_bits | next_state)
+    return Path_Result(None, reached)
+
+# Walks the came-from table back from the goal. The move recorded for a state slid the tile at target into the blank at index,
+# so sliding it back from index to target gives the previous state.
+def rebuild_path(problem, ranker, came_from, state):
+    targets = [dict((action_priority[action], target) for action, target in moves) for moves in problem.neighbors]
+    actions_by_priority = dict((priority, action) for action, priority in action_priority.items())
+    actions = []
+    while state != problem.initial:
+        index, priority = divmod(came_from[ranker.rank(state)], 4)
+        action = actions_by_priority[priority]
+        actions.append(action if problem.blank_count == 1 else [action, index])
+        state = problem.board.move(state, targets[index][priority], index)
+    actions.reverse()
+    return actions
@@ -0,0 +1,292 @@
+import heapq
+import itertools
+import multiprocessing
+import os
+import queue
+import sys
+import time
+
+from path_result import Path_Result
+from sliding_puzzle import Board, Sliding_Puzzle_Problem
+
+# Hash-distributed A* (HDA*) on several processes. Every state belongs to one worker, chosen by a hash of the packed state, and only that
+# worker keeps its path cost, its parent and its fringe entries, so each worker has its own fringe and explored table like the A* of the
+# parts. A worker expands its own best nodes and sends every child to the worker that owns it; the children for the same worker are sent
+# together in batches through the queue of that worker.
+#
+# The workers do not expand in the global f(n) order, so a state can be reached again with a lower path cost after it was expanded; it is
+# then expanded again. When a worker pops the goal, its path cost is sent to the main process, which tells every worker the best one so far
+# (the incumbent). Nodes whose f(n) is not below the incumbent are not expanded, and the search is over when no worker has such nodes and no
+# batch is on its way. The main process checks that by probing the workers in waves: each worker tells whether it is idle and how many
+# batches it has sent and received. Two waves in a row with every worker idle and the same totals, with as many batches received as sent,
+# mean nothing happened in between, so the incumbent is optimal (the heuristics are consistent). The path is then rebuilt by asking the owner
+# of every state on it for its parent.
+#
+# heuristic is 'manhattan' for the A* of part1, or 'conflicts' for the Manhattan distance + linear conflicts * 2 of part2.
+#
+#   python3 parallel_search.py <1|2> <input_file> [--workers N]    (compares the time with the sequential A* of the part)
+
+
+# The worker that owns the state. The multiplication mixes the bits of the packed state, whose low cells would otherwise decide alone.
+def owner(state, workers):
+    return ((state * 0x9E3779B97F4A7C15) >> 64) % workers
+
+def initial_heuristic(problem, heuristic):
+    if heuristic == 'manhattan':
+        return problem.manhattan_distance(problem.initial)
+    return problem.manhattan_distance(problem.initial) + problem.linear_conflicts(problem.initial) * 2
+
+
+class Hda_Result(Path_Result):
+
+    # worker_expansions and worker_reached are the expansions and the reached states of every worker; expanded_nodes is the sum of the
+    # reached states, like the explored + queue count of A*.
+    def __init__(self, path_actions, worker_expansions, worker_reached, seconds):
+        super().__init__(path_actions, sum(worker_reached))
+        self.worker_expansions = worker_expansions
+        self.worker_reached = worker_reached
+        self.seconds = seconds
+
+
+class Hda_Worker:
+
+    def __init__(self, number, workers, rows, cols, initial, goal, blank_count, heuristic, inboxes, results, batch_size):
+        self.number = number
+        self.workers = workers
+        self.board = Board(rows, cols)
+        self.problem = Sliding_Puzzle_Problem(initial, goal, self.board, blank_count)
+        if heuristic == 'manhattan':
+            self.heuristic_delta = lambda state, next_state, index, target: self.problem.manhattan_delta(state, index, target)
+        else:
+            self.heuristic_delta = self.problem.heuristic_delta
+        self.inboxes = inboxes
+        self.inbox = inboxes[number]
+        self.results = results
+        self.batch_size = batch_size
+        self.path_costs = {}  # The lowest path cost of every state of this worker reached so far.
+        self.came_from = {}  # The parent and the action of that path.
+        self.fringe = []  # Entries (f(n), action priority, counter, state, path cost, heuristic).
+        self.counter = itertools.count()
+        self.outboxes = [[] for number in range(workers)]
+        self.incumbent = float('inf')
+        self.expansions = 0
+        self.sent = 0
+        self.received = 0
+
+    # Entries are (state, path cost, heuristic, parent, action, action priority).
+    def insert(self, entries):
+        for state, path_cost, heuristic, parent, action, priority in entries:
+            if path_cost < self.path_costs.get(state, path_cost + 1):
+                self.path_costs[state] = path_cost
+                self.came_from[state] = (parent, action)
+                heapq.heappush(self.fringe, (path_cost + heuristic, priority, next(self.counter), state, path_cost, heuristic))
+
+    def send(self, number):
+        self.inboxes[number].put(('states', self.outboxes[number]))
+        self.outboxes[number] = []
+        self.sent += 1
+
+    def flush(self):
+        for number in range(self.workers):
+            if self.outboxes[number]:
+                self.send(number)
+
+    def busy(self):
+        return self.fringe and self.fringe[0][0] < self.incumbent
+
+    def expand_next(self):
+        f, priority, counter, state, path_cost, heuristic = heapq.heappop(self.fringe)
+        if path_cost > self.path_costs[state]:
+            return
+        if self.problem.goal_test(state):
+            if path_cost < self.incumbent:
+                self.incumbent = path_cost
+                self.results.put(('goal', path_cost))
+            return
+        self.expansions += 1
+        problem = self.problem
+        next_cost = path_cost + 1
+        for action, priority, index, target, next_blanks in problem.sliding_moves(problem.blank_key(state)):
+            next_state = problem.move(state, index, target)
+            next_heuristic = heuristic + self.heuristic_delta(state, next_state, index, target)
+            if next_cost + next_heuristic >= self.incumbent:
+                continue
+            entry = (next_state, next_cost, next_heuristic, state, action, priority)
+            number = owner(next_state, self.workers)
+            if number == self.number:
+                self.insert((entry,))
+            else:
+                self.outboxes[number].append(entry)
+                if len(self.outboxes[number]) >= self.batch_size:
+                    self.send(number)
+
+    # Handles a message of the main process or another worker. Returns False when the worker has to stop.
+    def handle(self, message):
+        kind = message[0]
+        if kind == 'states':
+            self.received += 1
+            self.insert(message[1])
+        elif kind == 'incumbent':
+            self.incumbent = min(self.incumbent, message[1])
+        elif kind == 'probe':
+            idle = not self.busy() and not any(self.outboxes)
+            self.results.put(('probe', message[1], self.number, idle, self.sent, self.received))
+        elif kind == 'parent':
+            parent, action = self.came_from[message[1]]
+            self.results.put(('parent', parent, action))
+        elif kind == 'stop':
+            self.results.put(('stats', self.number, self.expansions, len(self.path_costs)))
+            return False
+        return True
+
+    # Handles the messages that are waiting, without blocking.
+    def drain(self):
+        while True:
+            try:
+                message = self.inbox.get_nowait()
+            except queue.Empty:
+                return True
+            if not self.handle(message):
+                return False
+
+    def run(self):
+        while True:
+            if self.busy():
+                self.expand_next()
+                if self.expansions % 64 == 0:
+                    self.flush()
+                    if not self.drain():
+                        return
+            else:
+                self.flush()
+                if not self.handle(self.inbox.get()) or not self.drain():
+                    return
+
+
+def run_worker(*args):
+    Hda_Worker(*args).run()
+
+# Raises if a worker has died, since its states and its replies to the probes would then be missing and the search would wait forever.
+# Once the workers were told to stop, the ones that ended normally are fine.
+def check_workers(processes, stopped=False):
+    for number, process in enumerate(processes):
+        if not process.is_alive() and (not stopped or process.exitcode != 0):
+            raise RuntimeError('HDA* worker ' + str(number) + ' died with exit code ' + str(process.exitcode))
+
+# The next message of the workers, checking that they are all alive while waiting for it.
+def next_message(results, processes, stopped=False, timeout=0.1):
+    while True:
+        try:
+            return results.get(timeout=timeout)
+        except queue.Empty:
+            check_workers(processes, stopped)
+
+
+def hda_star(problem, heuristic='manhattan', workers=None, batch_size=256, probe_interval=0.005):
+    start = time.perf_counter()
+    if problem.goal_test(problem.initial):
+        return Hda_Result([], [0], [0], 0.0)
+    workers = workers or os.cpu_count()
+    board = problem.board
+    inboxes = [multiprocessing.Queue() for number in range(workers)]
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=run_worker, daemon=True,
+                                         args=(number, workers, board.rows, board.cols, problem.initial, problem.goal, problem.blank_count,
+                                               heuristic, inboxes, results, batch_size)) for number in range(workers)]
+    for process in processes:
+        process.start()
+    stopped = False
+    try:
+        inboxes[owner(problem.initial, workers)].put(('states', [(problem.initial, 0, initial_heuristic(problem, heuristic), None, None, 0)]))
+        sent = 1
+        incumbent = None
+        wave = 0
+        replies = None  # The replies to the current wave of probes, None when no wave is out.
+        previous = None  # The totals of the previous wave if every worker was idle in it.
+        while True:
+            try:
+                message = results.get(timeout=probe_interval)
+            except queue.Empty:
+                check_workers(processes)
+                if replies is None:
+                    wave += 1
+                    replies = []
+                    for inbox in inboxes:
+                        inbox.put(('probe', wave))
+                continue
+            if message[0] == 'goal':
+                if incumbent is None or message[1] < incumbent:
+                    incumbent = message[1]
+                    for inbox in inboxes:
+                        inbox.put(('incumbent', incumbent))
+            elif message[0] == 'probe' and message[1] == wave:
+                replies.append(message)
+                if len(replies) == workers:
+                    idle = all(reply[3] for reply in replies)
+                    totals = (sent + sum(reply[4] for reply in replies), sum(reply[5] for reply in replies))
+                    if idle and totals[0] == totals[1] and totals == previous:
+                        break
+                    previous = totals if idle else None
+                    replies = None
+
+        actions = None
+        if incumbent is not None:
+            actions = []
+            state = problem.goal
+            while state != problem.initial:
+                inboxes[owner(state, workers)].put(('parent', state))
+                message = next_message(results, processes)
+                while message[0] != 'parent':
+                    message = next_message(results, processes)
+                actions.append(message[2])
+                state = message[1]
+            actions.reverse()
+        for inbox in inboxes:
+            inbox.put(('stop',))
+        stopped = True
+        worker_expansions = [0] * workers
+        worker_reached = [0] * workers
+        for number in range(workers):
+            message = next_message(results, processes, stopped=True)
+            while message[0] != 'stats':
+                message = next_message(results, processes, stopped=True)
+            worker_expansions[message[1]] = message[2]
+            worker_reached[message[1]] = message[3]
+    finally:
+        # After a failure, the other workers are not waiting for a stop message that will not come.
+        for process in processes:
+            process.join(timeout=5 if stopped else 0)
+            if process.is_alive():
+                process.terminate()
+    return Hda_Result(actions, worker_expansions, worker_reached, time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+
+    # Solves the input with HDA* and with the sequential A* of the part and prints the expansions of every worker and the speedup.
+    arguments = sys.argv[1:]
+    workers = None
+    if '--workers' in arguments:
+        position = arguments.index('--workers')
+        workers = int(arguments[position + 1])
+        del arguments[position:position + 2]
+    if len(arguments) != 2 or arguments[0] not in ('1', '2'):
+        print("Usage: python parallel_search.py <1|2> <input_file> [--workers N]")
+        exit(1)
+
+    import part1
+    import part2
+
+    part = part1 if arguments[0] == '1' else part2
+    input_state = part.read_input(arguments[1])
+    start = time.perf_counter()
+    astar_result = part.solve(input_state)
+    astar_seconds = time.perf_counter() - start
+    result = part.solve(input_state, 'hda_star', workers=workers)
+    print('A*:    path cost ' + str(astar_result.path_cost) + ', expanded nodes ' + str(astar_result.expanded_nodes)
+          + (', %.3f s' % astar_seconds))
+    print('HDA*:  path cost ' + str(result.path_cost) + ', expanded nodes ' + str(result.expanded_nodes) + (', %.3f s' % result.seconds)
+          + ' on ' + str(len(result.worker_expansions)) + ' workers')
+    for number, expansions in enumerate(result.worker_expansions):
+        print('  worker ' + str(number) + ': ' + str(expansions) + ' expansions, ' + str(result.worker_reached[number]) + ' reached states')
+    print('Speedup: %.2f' % (astar_seconds / result.seconds))
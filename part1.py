@@ -1,94 +1,56 @@
-from queue import PriorityQueue
-import sys
+import argparse
 from collections import deque
-
-bfs_explored = set()
-dfs_explored = set()
-uni_explored = set()
-greedy_explored = set()
-astar_explored = set()
-
-bfs_queue = set()
-dfs_queue = set()
-uni_queue = set()
-greedy_queue = set()
-astar_queue = set()
-
-# The dictionaries of costs of states that are in the queue. The costs are the f(n) values, i.e. the path cost + heuristic (for greedy, only the heuristic).
-# The reason for me to use a dictionary is that accessing and deleting f(n) value of a given state in the fringe is very costly since PriortyQueue is not directly support such operations.
-# If there is a child whose f(n) is lower than the node of a fringe (having same states of course), I also add the child to the fringe. So, fringe can have multiple nodes with same states but different f(n) values.
-# But after exploring one with the lowest f(n) value, with the help of the checks in the lines 261/289/317, others directly popped without having any effect on the result.
-uni_state_fn_cost = {}
-greedy_state_fn_cost = {}
-astar_state_fn_cost = {}
-
-# The class that represents the 8-puzzle problem.
-class Eight_Puzzle_Problem:
+from concurrent.futures import ProcessPoolExecutor
+from fringe import Heap_Fringe
+from sliding_puzzle import Board, Sliding_Puzzle_Problem
+from search_stats import Search_Stats
+import search_stats
+import bidirectional
+import pattern_database
+import lean_search
+import anytime_search
+import parallel_search
+from path_result import Path_Result, Search_Result
+
+# The 3x3 board of the 8-puzzle. The states are packed by the board (see sliding_puzzle.py) with 4 bits per cell, the first cell being the
+# most significant nibble, so the state "123456780" is stored as 0x123456780. Strings are only used while parsing the input and printing the states.
+board_3x3 = Board(3, 3)
+
+def pack_state(state):
+    return int(state, 16)
+
+def unpack_state(state):
+    return format(state, '09x')
+
+# The class that represents the 8-puzzle problem. The geometry is the one of the 3x3 board; the same searches also run on a
+# Sliding_Puzzle_Problem of any other board, e.g. the 15-puzzle on Board(4, 4).
+class Eight_Puzzle_Problem(Sliding_Puzzle_Problem):
 
     def __init__(self, initial, goal=None):
-        self.initial = initial  # Initial state.
-        self.goal = goal  # Goal state.
-
-    def actions(self, state):
-        actions = []
-        index = state.index('0')
-        if index == 0:
-            actions = ['R', 'D']
-        elif index == 1:
-            actions = ['R', 'D', 'L']
-        elif index == 2:
-            actions = ['D', 'L']
-        elif index == 3:
-            actions = ['U', 'R', 'D']
-        elif index == 4:
-            actions = ['U', 'R', 'D', 'L']
-        elif index == 5:
-            actions = ['U', 'D', 'L']
-        elif index == 6:
-            actions = ['U', 'R']
-        elif index == 7:
-            actions = ['U', 'R', 'L']
-        elif index == 8:
-            actions = ['U', 'L']
-        return actions
-    
-    @staticmethod
-    def result(state, action):
-        index = state.index('0')
-        new_state = list(state)
-        if action == 'U':
-            new_state[index], new_state[index-3] = new_state[index-3], new_state[index]
-        elif action == 'R':
-            new_state[index], new_state[index+1] = new_state[index+1], new_state[index]
-        elif action == 'D':
-            new_state[index], new_state[index+3] = new_state[index+3], new_state[index]
-        elif action == 'L':
-            new_state[index], new_state[index-1] = new_state[index-1], new_state[index]
-        return ''.join(new_state)
-    
-    def goal_test(self, state):
-        return state == self.goal
+        super().__init__(initial, goal, board_3x3, 1)
     
 
 class Node:
 
-    # Action proirty is implemented as requested in the project description.
-    action_priority = {'U': 0, 'R': 1, 'D': 2, 'L': 3}
+    # Nodes are made for every generated state, so they have no __dict__.
+    __slots__ = ('state', 'parent', 'action', 'path_cost', 'blank')
 
-    def __init__(self, state, parent=None, action=None, path_cost=0):
+    # The blank is carried on the node (see Board.moves), so it is never searched for again while expanding.
+    def __init__(self, state, parent=None, action=None, path_cost=0, blank=None):
         self.state = state
         self.parent = parent
         self.action = action
         self.path_cost = path_cost
+        self.blank = blank
 
     def __eq__(self, other):
         return self.state == other.state
     
     def expand(self, problem):
         childs = []
-        for action in problem.actions(self.state):
-            next_state = Eight_Puzzle_Problem.result(self.state, action)
-            next_node = Node(next_state, self, action, self.path_cost + 1)
+        for action, priority, index, target, next_blank in problem.moves(self.blank):
+            next_state = problem.move(self.state, index, target)
+            next_node = Node(next_state, self, action, self.path_cost + 1, next_blank)
             childs.append(next_node)
         return childs
     
@@ -105,282 +67,466 @@ class Node:
         return actions
     
     @staticmethod
-    def check_actions_path(state, actions):
+    def check_actions_path(state, actions, board=board_3x3):
         for action in actions:
-            next_state = Eight_Puzzle_Problem.result(state, action)
+            next_state = board.result(state, action)
             state = next_state
         return state
-
-
-    
-    @staticmethod
-    def manhattan_distance(state):
-        goal = "123456780"
-        distance = 0
-        for i in range(1, 9):
-            dx = abs(state.index(str(i)) % 3 - goal.index(str(i)) % 3)
-            dy = abs(state.index(str(i)) // 3 - goal.index(str(i)) // 3)
-            distance += (dx + dy)
-        return distance
     
     @staticmethod
-    def print_states(state):
-        print(state[0] + " " + state[1] + " " + state[2])
-        print(state[3] + " " + state[4] + " " + state[5])
-        print(state[6] + " " + state[7] + " " + state[8])
+    def print_states(state, board=board_3x3):
+        print(board.format(state))
         print()
         
 class Node_Astar(Node):
 
-    def __init__(self, state, parent=None, action=None, path_cost=0):
-        super().__init__(state, parent, action, path_cost)
-        self.heuristic = self.manhattan_distance(state)
+    __slots__ = ('heuristic', 'key')
+
+    # The heuristic is only computed from scratch for the initial node; children get it from their parent in expand.
+    # For the fringe, the f(n) function is the sum of the heuristic value and the path cost. Then
+    # actions are prioritized according to the project description. The key is computed once here, so the fringe only compares tuples.
+    def __init__(self, state, parent=None, action=None, path_cost=0, blank=None, heuristic=0, priority=0):
+        super().__init__(state, parent, action, path_cost, blank)
+        self.heuristic = heuristic
+        self.key = (path_cost + heuristic, priority)
     
-    # For the PriorityQueue (fringe), the f(n) function is the sum of the heuristic value and the path cost. Then
-    # actions are prioritized according to the project description.
     def __lt__(self, other):
-        if self.path_cost + self.heuristic < other.path_cost + other.heuristic:
-            return True
-        elif self.path_cost + self.heuristic == other.path_cost + other.heuristic:
-            return self.action_priority[self.action] < self.action_priority[other.action]
-        else:
-            return False
+        return self.key < other.key
         
-    def expand(self, problem):
+    # With a heuristic function (such as the pattern databases), the heuristic of every child is computed by it instead of the Manhattan delta.
+    def expand(self, problem, heuristic=None):
         childs = []
-        for action in problem.actions(self.state):
-            next_state = problem.result(self.state, action)
-            next_node = Node_Astar(next_state, self, action, self.path_cost + 1)
+        for action, priority, index, target, next_blank in problem.moves(self.blank):
+            next_state = problem.move(self.state, index, target)
+            if heuristic is None:
+                next_heuristic = self.heuristic + problem.manhattan_delta(self.state, index, target)
+            else:
+                next_heuristic = heuristic(next_state)
+            next_node = Node_Astar(next_state, self, action, self.path_cost + 1, next_blank, next_heuristic, priority)
             childs.append(next_node)
         return childs
     
 class Node_Greedy(Node):
 
-    def __init__(self, state, parent=None, action=None, path_cost=0):
-        super().__init__(state, parent, action, path_cost)
-        self.heuristic = self.manhattan_distance(state)
-    
-    # For the PriorityQueue (fringe), the f(n) function is the heuristic value. Then
+    __slots__ = ('heuristic', 'key')
+
+    # The heuristic is only computed from scratch for the initial node; children get it from their parent in expand.
+    # For the fringe, the f(n) function is the heuristic value. Then
     # prioritization is made according to the project description. First path cost, then action priority.
+    def __init__(self, state, parent=None, action=None, path_cost=0, blank=None, heuristic=0, priority=0):
+        super().__init__(state, parent, action, path_cost, blank)
+        self.heuristic = heuristic
+        self.key = (heuristic, path_cost, priority)
+    
     def __lt__(self, other):
-        if self.heuristic < other.heuristic:
-            return True
-        elif self.heuristic == other.heuristic:
-            if self.path_cost < other.path_cost:
-                return True
-            elif self.path_cost == other.path_cost:
-                return self.action_priority[self.action] < self.action_priority[other.action]
-            else:
-                return False
-        else:
-            return False
+        return self.key < other.key
 
-    def expand(self, problem):
+    # With a heuristic function (such as the pattern databases), the heuristic of every child is computed by it instead of the Manhattan delta.
+    def expand(self, problem, heuristic=None):
         childs = []
-        for action in problem.actions(self.state):
-            next_state = problem.result(self.state, action)
-            next_node = Node_Greedy(next_state, self, action, self.path_cost + 1)
+        for action, priority, index, target, next_blank in problem.moves(self.blank):
+            next_state = problem.move(self.state, index, target)
+            if heuristic is None:
+                next_heuristic = self.heuristic + problem.manhattan_delta(self.state, index, target)
+            else:
+                next_heuristic = heuristic(next_state)
+            next_node = Node_Greedy(next_state, self, action, self.path_cost + 1, next_blank, next_heuristic, priority)
             childs.append(next_node)
         return childs
     
 class Node_Uniform(Node):
+
+    __slots__ = ('key',)
     
-    def __init__(self, state, parent=None, action=None, path_cost=0):
-        super().__init__(state, parent, action, path_cost)
-    
-    # For the PriorityQueue (fringe), the f(n) function is the path cost. Then
+    # For the fringe, the f(n) function is the path cost. Then
     # actions are prioritized according to the project description.
+    def __init__(self, state, parent=None, action=None, path_cost=0, blank=None, priority=0):
+        super().__init__(state, parent, action, path_cost, blank)
+        self.key = (path_cost, priority)
+    
     def __lt__(self, other):
-        if self.path_cost < other.path_cost:
-            return True
-        elif self.path_cost == other.path_cost:
-            return self.action_priority[self.action] < self.action_priority[other.action]
-        else:
-            return False
+        return self.key < other.key
         
     def expand(self, problem):
         childs = []
-        for action in problem.actions(self.state):
-            next_state = problem.result(self.state, action)
-            next_node = Node_Uniform(next_state, self, action, self.path_cost + 1)
+        for action, priority, index, target, next_blank in problem.moves(self.blank):
+            next_state = problem.move(self.state, index, target)
+            next_node = Node_Uniform(next_state, self, action, self.path_cost + 1, next_blank, priority)
             childs.append(next_node)
         return childs
-    
+
+# The heuristic of the initial state: the given heuristic function, or the Manhattan distance to the goal of the problem.
+def initial_heuristic(problem, heuristic):
+    if heuristic is not None:
+        return heuristic(problem.initial)
+    return problem.manhattan_distance(problem.initial)
+
+# Every search keeps its own explored set (the states that have been explored) and queue set (the states that are in the fringe),
+# so searches can be run any number of times in the same process without affecting each other.
+#
+# The best-first searches also keep a dictionary of costs of states that are in the queue. The costs are the f(n) values, i.e. the path cost + heuristic (for greedy, only the heuristic).
+# The reason for me to use a dictionary is that accessing and deleting f(n) value of a given state in the fringe is very costly since heaps do not directly support such operations.
+# If there is a child whose f(n) is lower than the node of a fringe (having same states of course), I also add the child to the fringe. So, fringe can have multiple nodes with same states but different f(n) values.
+# But after exploring one with the lowest f(n) value, with the help of the explored checks right after popping, others directly popped without having any effect on the result.
 
 # Implementation of the classical breadth-first search algorithm.
-def bfs(problem):
-    initial_node = Node(problem.initial)
+def bfs(problem, stats=None):
+    if stats is not None:
+        problem = stats.start(problem)
+    explored = set()
+    queue = set()
+    initial_node = Node(problem.initial, blank=problem.blank_key(problem.initial))
     if problem.goal_test(initial_node.state):
-        return initial_node
-    fringe = deque([initial_node])
-    bfs_queue.add(initial_node.state)
+        return Search_Result(initial_node, explored, queue, stats)
+    fringe = deque([initial_node]) if stats is None else stats.deque([initial_node])
+    queue.add(initial_node.state)
     while fringe:
         node = fringe.popleft()
-        bfs_explored.add(node.state)
-        bfs_queue.remove(node.state)
+        explored.add(node.state)
+        queue.remove(node.state)
         if problem.goal_test(node.state):
-            return node
+            return Search_Result(node, explored, queue, stats)
         for child in node.expand(problem):
-            if (child.state not in bfs_explored) and child.state not in bfs_queue:
+            if (child.state not in explored) and child.state not in queue:
                 fringe.append(child)
-                bfs_queue.add(child.state)
-    return None
+                queue.add(child.state)
+    return Search_Result(None, explored, queue, stats)
 
 # Implementation of the classical depth-first search algorithm.
-def dfs(problem):
-    initial_node = Node(problem.initial)
+def dfs(problem, stats=None):
+    if stats is not None:
+        problem = stats.start(problem)
+    explored = set()
+    queue = set()
+    initial_node = Node(problem.initial, blank=problem.blank_key(problem.initial))
     if problem.goal_test(initial_node.state):
-        return initial_node
-    fringe = deque([initial_node])
-    dfs_queue.add(initial_node.state)
+        return Search_Result(initial_node, explored, queue, stats)
+    fringe = deque([initial_node]) if stats is None else stats.deque([initial_node])
+    queue.add(initial_node.state)
     while fringe:
         node = fringe.pop()
-        if node.state in dfs_explored:
+        if node.state in explored:
             continue
-        dfs_explored.add(node.state)
-        dfs_queue.remove(node.state)
+        explored.add(node.state)
+        queue.remove(node.state)
         if problem.goal_test(node.state):
-            return node
+            return Search_Result(node, explored, queue, stats)
         for child in node.expand(problem):
-            if child.state not in dfs_explored:
+            if child.state not in explored:
                 fringe.append(child)
-                dfs_queue.add(child.state)
-    return None
-
-# Implementation of the classical uniform-cost search algorithm. The only difference is the extra check in the line 261 which is explained in the comments for uni_state_fn_cost dictionary.
-def ucs(problem):
-    initial_node = Node_Uniform(problem.initial)
+                queue.add(child.state)
+    return Search_Result(None, explored, queue, stats)
+
+# Depth-limited depth-first search. Unlike dfs above, there is no explored set: only the states on the current path are remembered, and a
+# child that is already on the path is skipped, so the memory grows with the limit instead of the number of states. There is no recursion
+# either; the stack holds the move list of every node on the path and the position of the next move to try in it, so the children are tried
+# in the action priority order. Returns the actions of a path of at most limit moves (or None), the number of expanded nodes, and whether
+# the limit cut off some path, i.e. whether a larger limit could still find a solution. A state that cannot reach the goal (the wrong
+# parity, half of the 8-puzzle states) is not searched at all, since no limit would find a path from it.
+def depth_limited_search(problem, limit):
+    state = problem.initial
+    if problem.goal_test(state):
+        return [], 0, False
+    if not problem.board.solvable(state, problem.goal):
+        return None, 0, False
+    if limit <= 0:
+        return None, 0, True
+    blank = problem.blank_key(state)
+    on_path = {state}
+    path = []  # The actions from the initial state.
+    states = []  # The states and blanks before each action of the path, to go back.
+    move_lists = [problem.moves(blank)]
+    positions = [0]
+    expanded_nodes = 1
+    cutoff = False
+    while positions:
+        moves = move_lists[-1]
+        position = positions[-1]
+        if position == len(moves):
+            move_lists.pop()
+            positions.pop()
+            if path:
+                path.pop()
+                on_path.remove(state)
+                state, blank = states.pop()
+            continue
+        positions[-1] = position + 1
+        action, priority, index, target, next_blank = moves[position]
+        next_state = problem.move(state, index, target)
+        if next_state in on_path:
+            continue
+        if problem.goal_test(next_state):
+            path.append(action)
+            return path, expanded_nodes, cutoff
+        if len(path) + 1 >= limit:
+            cutoff = True
+            continue
+        path.append(action)
+        states.append((state, blank))
+        on_path.add(next_state)
+        state = next_state
+        blank = next_blank
+        expanded_nodes += 1
+        move_lists.append(problem.moves(blank))
+        positions.append(0)
+    return None, expanded_nodes, cutoff
+
+# The default limit is 31, the largest optimal path cost of the 8-puzzle, so every solvable 8-puzzle is solved within it.
+def depth_limited_dfs(problem, limit=31):
+    path, expanded_nodes, cutoff = depth_limited_search(problem, limit)
+    return Path_Result(path, expanded_nodes)
+
+# Iterative deepening depth-first search: the depth-limited search with the limits 0, 1, 2, ... until a path is found, so the path is
+# optimal while the memory still only grows with its length. It stops without a path when no path was cut off by the limit (right away
+# for the states that cannot reach the goal), or at max_depth.
+# The expanded nodes are summed over all iterations.
+def iddfs(problem, max_depth=None):
+    expanded_nodes = 0
+    limit = 0
+    while max_depth is None or limit <= max_depth:
+        path, iteration_nodes, cutoff = depth_limited_search(problem, limit)
+        expanded_nodes += iteration_nodes
+        if path is not None or not cutoff:
+            return Path_Result(path, expanded_nodes)
+        limit += 1
+    return Path_Result(None, expanded_nodes)
+
+# Implementation of the classical uniform-cost search algorithm. The only difference is the extra check after popping which is explained in the comments above.
+def ucs(problem, fringe_type=Heap_Fringe, stats=None):
+    if stats is not None:
+        problem, fringe_type = stats.start(problem), stats.fringe_type(fringe_type)
+    explored = set()
+    queue = set()
+    state_fn_cost = {}
+    initial_node = Node_Uniform(problem.initial, blank=problem.blank_key(problem.initial))
     if problem.goal_test(initial_node.state):
-        return initial_node
-    fringe = PriorityQueue()
-    fringe.put(initial_node)
-    uni_queue.add(initial_node.state)
-    uni_state_fn_cost[initial_node.state] = initial_node.path_cost
+        return Search_Result(initial_node, explored, queue, stats)
+    fringe = fringe_type()
+    fringe.put(initial_node.key, initial_node)
+    queue.add(initial_node.state)
+    state_fn_cost[initial_node.state] = initial_node.path_cost
     while fringe:
         node = fringe.get()
-        if node in uni_explored:
+        if node.state in explored:
             continue
-        uni_explored.add(node.state)
-        uni_queue.remove(node.state)
+        explored.add(node.state)
+        queue.remove(node.state)
         if problem.goal_test(node.state):
-            return node
+            return Search_Result(node, explored, queue, stats)
         for child in node.expand(problem):
-            if child.state not in uni_explored and child.state not in uni_queue:
-                fringe.put(child)
-                uni_queue.add(child.state)
-                uni_state_fn_cost[child.state] = child.path_cost
-            elif child.state in uni_queue:
-                if child.path_cost < uni_state_fn_cost[child.state]:
-                    fringe.put(child)
-                    uni_state_fn_cost[child.state] = child.path_cost
-    return None
-
-# Implementation of the classical greedy search algorithm. The only difference is the extra check in the line 289 which is explained in the comments for greedy_state_fn_cost dictionary.
-def greedy(problem):
-    initial_node = Node_Greedy(problem.initial)
+            if child.state not in explored and child.state not in queue:
+                fringe.put(child.key, child)
+                queue.add(child.state)
+                state_fn_cost[child.state] = child.path_cost
+            elif child.state in queue:
+                if child.path_cost < state_fn_cost[child.state]:
+                    fringe.put(child.key, child)
+                    state_fn_cost[child.state] = child.path_cost
+    return Search_Result(None, explored, queue, stats)
+
+# Implementation of the classical greedy search algorithm. The only difference is the extra check after popping which is explained in the comments above.
+# heuristic is a function of the state replacing the Manhattan distance, e.g. pattern_database_heuristic().
+def greedy(problem, fringe_type=Heap_Fringe, heuristic=None, stats=None):
+    if stats is not None:
+        problem, heuristic, fringe_type = stats.start(problem), stats.timed(heuristic), stats.fringe_type(fringe_type)
+    explored = set()
+    queue = set()
+    state_fn_cost = {}
+    initial_node = Node_Greedy(problem.initial, blank=problem.blank_key(problem.initial), heuristic=initial_heuristic(problem, heuristic))
     if problem.goal_test(initial_node.state):
-        return initial_node
-    fringe = PriorityQueue()
-    fringe.put(initial_node)
-    greedy_queue.add(initial_node.state)
-    greedy_state_fn_cost[initial_node.state] = initial_node.heuristic
+        return Search_Result(initial_node, explored, queue, stats)
+    fringe = fringe_type()
+    fringe.put(initial_node.key, initial_node)
+    queue.add(initial_node.state)
+    state_fn_cost[initial_node.state] = initial_node.heuristic
     while fringe:
         node = fringe.get()
-        if node.state in greedy_explored:
+        if node.state in explored:
             continue
-        greedy_explored.add(node.state)
-        greedy_queue.remove(node.state)
+        explored.add(node.state)
+        queue.remove(node.state)
         if problem.goal_test(node.state):
-            return node
-        for child in node.expand(problem):
-            if child.state not in greedy_explored and child.state not in greedy_queue:
-                fringe.put(child)
-                greedy_queue.add(child.state)
-                greedy_state_fn_cost[child.state] = child.heuristic
-            elif child.state in greedy_queue:
-                if child.heuristic < greedy_state_fn_cost[child.state]:
-                    fringe.put(child)
-                    greedy_state_fn_cost[child.state] = child.heuristic
-    return None
-
-# Implementation of the classical A* search algorithm. The only difference is the extra check in the line 317 which is explained in the comments for astar_state_fn_cost dictionary.
-def astar(problem):
-    initial_node = Node_Astar(problem.initial)
+            return Search_Result(node, explored, queue, stats)
+        for child in node.expand(problem, heuristic):
+            if child.state not in explored and child.state not in queue:
+                fringe.put(child.key, child)
+                queue.add(child.state)
+                state_fn_cost[child.state] = child.heuristic
+            elif child.state in queue:
+                if child.heuristic < state_fn_cost[child.state]:
+                    fringe.put(child.key, child)
+                    state_fn_cost[child.state] = child.heuristic
+    return Search_Result(None, explored, queue, stats)
+
+# Implementation of the classical A* search algorithm. The only difference is the extra check after popping which is explained in the comments above.
+# heuristic is a function of the state replacing the Manhattan distance, e.g. pattern_database_heuristic().
+# With a solution_cache.Solution_Cache, the search goes through the cache, see solution_cache.py.
+def astar(problem, fringe_type=Heap_Fringe, heuristic=None, stats=None, cache=None):
+    if cache is not None:
+        return cache.search(astar, problem, problem.manhattan_distance if heuristic is None else heuristic, fringe_type=fringe_type, stats=stats)
+    if stats is not None:
+        problem, heuristic, fringe_type = stats.start(problem), stats.timed(heuristic), stats.fringe_type(fringe_type)
+    explored = set()
+    queue = set()
+    state_fn_cost = {}
+    initial_node = Node_Astar(problem.initial, blank=problem.blank_key(problem.initial), heuristic=initial_heuristic(problem, heuristic))
     if problem.goal_test(initial_node.state):
-        return initial_node
-    fringe = PriorityQueue()
-    fringe.put(initial_node)
-    astar_queue.add(initial_node.state)
-    astar_state_fn_cost[initial_node.state] = initial_node.heuristic + initial_node.path_cost
+        return Search_Result(initial_node, explored, queue, stats)
+    fringe = fringe_type()
+    fringe.put(initial_node.key, initial_node)
+    queue.add(initial_node.state)
+    state_fn_cost[initial_node.state] = initial_node.heuristic + initial_node.path_cost
     while fringe:
         node = fringe.get()
-        if node.state in astar_explored:
+        if node.state in explored:
             continue
-        astar_explored.add(node.state)
-        astar_queue.remove(node.state)
+        explored.add(node.state)
+        queue.remove(node.state)
         if problem.goal_test(node.state):
-            return node
-        for child in node.expand(problem):
-            if child.state not in astar_explored and child.state not in astar_queue:
-                fringe.put(child)
-                astar_queue.add(child.state)
-                astar_state_fn_cost[child.state] = child.heuristic + child.path_cost
-            elif child.state in astar_queue:
-                if child.heuristic + child.path_cost < astar_state_fn_cost[child.state]:
-                    fringe.put(child)
-                    astar_state_fn_cost[child.state] = child.heuristic + child.path_cost
-    return None
-
-    
-# Program excepts three arguments as requested in the project description.
-if len(sys.argv) != 3:
-    print("Usage: python part1.py <input_file> <output_file>")
-    exit(1)
-
-input_state = ''
-with open(sys.argv[1], 'r') as file:
-    for line in file:
-        line_numbers = ''.join(line.split())
-        input_state += line_numbers
-
-#print(input_state)
-
-Eight_Puzzle = Eight_Puzzle_Problem(input_state, "123456780")
-
-bfs_result = bfs(Eight_Puzzle)
-dfs_result = dfs(Eight_Puzzle)
-ucs_result = ucs(Eight_Puzzle)
-greedy_result = greedy(Eight_Puzzle)
-astar_result = astar(Eight_Puzzle)
-
-print(Node.check_actions_path(input_state, bfs_result.actions()))
-print(Node.check_actions_path(input_state, dfs_result.actions()))
-print(Node.check_actions_path(input_state, ucs_result.actions()))
-print(Node.check_actions_path(input_state, greedy_result.actions()))
-print(Node.check_actions_path(input_state, astar_result.actions()))
-
-with open(sys.argv[2], 'w') as file:
-
-    file.write('BFS: ' + '\n')
-    file.write('Expanded nodes: ' + str(len(bfs_explored) + len(bfs_queue)) + '\n')
-    file.write('Path cost: ' + str(bfs_result.path_cost) + '\n')
-    file.write('Actions: ' + str(bfs_result.actions()) + '\n')
-    file.write('DFS: ' + '\n')
-    file.write('Expanded nodes: ' + str(len(dfs_explored) + len(dfs_queue)) + '\n')
-    file.write('Path cost: ' + str(dfs_result.path_cost) + '\n')
-    file.write('Actions: ' + str(dfs_result.actions()) + '\n')
-    file.write('UCS: ' + '\n')
-    file.write('Expanded nodes: ' + str(len(uni_explored) + len(uni_queue)) + '\n')
-    file.write('Path cost: ' + str(ucs_result.path_cost) + '\n')
-    file.write('Actions: ' + str(ucs_result.actions()) + '\n')
-    file.write('Greedy: ' + '\n')
-    file.write('Expanded nodes: ' + str(len(greedy_explored) + len(greedy_queue)) + '\n')
-    file.write('Path cost: ' + str(greedy_result.path_cost) + '\n')
-    file.write('Actions: ' + str(greedy_result.actions()) + '\n')
-    file.write('A*: ' + '\n')
-    file.write('Expanded nodes: ' + str(len(astar_explored) + len(astar_queue)) + '\n')
-    file.write('Path cost: ' + str(astar_result.path_cost) + '\n')
-    file.write('Actions: ' + str(astar_result.actions()) + '\n')
+            return Search_Result(node, explored, queue, stats)
+        for child in node.expand(problem, heuristic):
+            if child.state not in explored and child.state not in queue:
+                fringe.put(child.key, child)
+                queue.add(child.state)
+                state_fn_cost[child.state] = child.heuristic + child.path_cost
+            elif child.state in queue:
+                if child.heuristic + child.path_cost < state_fn_cost[child.state]:
+                    fringe.put(child.key, child)
+                    state_fn_cost[child.state] = child.heuristic + child.path_cost
+    return Search_Result(None, explored, queue, stats)
+
+# Reads the grid in the input file into a packed state of the board.
+def read_input(path, board=board_3x3):
+    with open(path, 'r') as file:
+        return board.parse(file.read())
+
+# Bidirectional searches, see bidirectional.py. The forward side of the bidirectional A* uses the same Manhattan distance as A*,
+# and the backward side uses the Manhattan distance to the initial state.
+def bidirectional_bfs(problem):
+    return bidirectional.bidirectional_bfs(problem)
+
+def bidirectional_astar(problem):
+    to_initial = problem.board.manhattan_table(problem.initial)
+    return bidirectional.bidirectional_astar(problem, problem.manhattan_distance, lambda state: problem.board.table_distance(to_initial, state))
+
+# Memory-lean A* with the same heuristic, see lean_search.py.
+def lean_astar(problem):
+    return lean_search.lean_astar(problem, problem.manhattan_distance,
+                                  lambda state, next_state, index, target: problem.manhattan_delta(state, index, target))
+
+# Weighted A* and the anytime ARA* with the same Manhattan distance, see anytime_search.py. The results also have a proven bound on how far
+# the path cost can be from the optimal one.
+def weighted_astar(problem, weight=2.0, heuristic=None, fringe_type=Heap_Fringe):
+    return anytime_search.weighted_astar(problem, Node_Astar, initial_heuristic(problem, heuristic), heuristic, weight, fringe_type)
+
+def ara_star(problem, weight=3.0, step=0.5, time_limit=None, heuristic=None, fringe_type=Heap_Fringe):
+    return anytime_search.ara_star(problem, Node_Astar, initial_heuristic(problem, heuristic), heuristic, weight, step, time_limit, fringe_type)
+
+# Hash-distributed A* on several processes with the same Manhattan distance, see parallel_search.py.
+def hda_star(problem, workers=None, batch_size=256):
+    return parallel_search.hda_star(problem, 'manhattan', workers, batch_size)
+
+algorithms = {'bfs': bfs, 'dfs': dfs, 'ucs': ucs, 'greedy': greedy, 'astar': astar,
+              'bidirectional_bfs': bidirectional_bfs, 'bidirectional_astar': bidirectional_astar, 'lean_astar': lean_astar,
+              'depth_limited_dfs': depth_limited_dfs, 'iddfs': iddfs, 'weighted_astar': weighted_astar, 'ara_star': ara_star,
+              'hda_star': hda_star}
+
+# Additive pattern databases of the tiles {1, 2, 3, 4} and {5, 6, 7, 8}, see pattern_database.py.
+def pattern_database_heuristic(goal="123456780"):
+    if isinstance(goal, str):
+        goal = pack_state(goal)
+    return pattern_database.additive_heuristic(board_3x3, goal, ((1, 2, 3, 4), (5, 6, 7, 8)), 'part1')
+
+# Library entry point. The state and the goal can be given as strings like "123456780" or as packed states.
+# heuristic='pattern_database' selects the pattern databases for greedy and A*.
+# With board, the puzzle is solved on that board instead of the 3x3 one, e.g. solve("1 2 3 4 5 6 7 8 9 10 11 12 13 14 0 15", board=Board(4, 4)).
+# Without a goal, the goal is the tiles in order followed by the blank.
+# Any other goal is relabeled to the goal with the same blanks and the tiles in order (see Board.relabeled), so all the goals with the blanks
+# in the same cells share the heuristic tables, the pattern databases and the solution cache. The actions are the same for both, so the
+# result is the one of the given goal. A heuristic function given by the caller is computed on the states as given, so it turns this off.
+# Every call builds its own problem and search containers, so it can be called from long-lived processes as many times as needed.
+def solve(state, algorithm='astar', goal=None, board=board_3x3, **options):
+    if isinstance(state, str):
+        state = board.parse(state)
+    if goal is None:
+        goal = board.goal_state(1)
+    elif isinstance(goal, str):
+        goal = board.parse(goal)
+    if not callable(options.get('heuristic')):
+        state, goal = board.relabeled(state, goal)
+    if options.get('heuristic') == 'pattern_database':
+        if board is not board_3x3:
+            raise ValueError('the pattern databases are only set up for the 3x3 board')
+        options['heuristic'] = pattern_database_heuristic(goal)
+    problem = Eight_Puzzle_Problem(state, goal) if board is board_3x3 else Sliding_Puzzle_Problem(state, goal, board, 1)
+    return algorithms[algorithm](problem, **options)
+
+# The sections of the output file, in the order they are written.
+sections = (('BFS', 'bfs'), ('DFS', 'dfs'), ('UCS', 'ucs'), ('Greedy', 'greedy'), ('A*', 'astar'))
+
+# Runs the five searches on the state, or only the given algorithms of them. The results are (name, result) pairs in the order they are written.
+# With stats, every search is given a Search_Stats, which is kept in result.stats.
+# With workers, the searches run at the same time on a process pool of that many processes, so the whole takes about as long as the slowest
+# search instead of the sum of all of them. The results are then Path_Results, since the chains of nodes are not sent between processes.
+def solve_all(state, goal=None, board=board_3x3, stats=False, selected=None, workers=0):
+    names = [(name, algorithm) for name, algorithm in sections if selected is None or algorithm in selected]
+    if not workers:
+        results = []
+        for name, algorithm in names:
+            options = {'stats': Search_Stats()} if stats else {}
+            results.append((name, solve(state, algorithm, goal, board, **options)))
+        return results
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [(name, executor.submit(solve_task, state, algorithm, goal, None if board is board_3x3 else board, stats)) for name, algorithm in names]
+        return [(name, future.result()) for name, future in futures]
+
+# Runs one search of solve_all in a worker. The board is None for the 3x3 one, which the worker has itself.
+def solve_task(state, algorithm, goal, board, stats):
+    options = {'stats': Search_Stats()} if stats else {}
+    result = solve(state, algorithm, goal, board_3x3 if board is None else board, **options)
+    return Path_Result(result.actions() if result.path_cost is not None else None, result.expanded_nodes, result.stats)
+
+# The text of the output file for the results. It is built as one string, so the file is written at once.
+def output_text(results):
+    return ''.join(name + ': ' + '\n' + 'Expanded nodes: ' + str(result.expanded_nodes) + '\n' + 'Path cost: ' + str(result.path_cost) + '\n'
+                   + 'Actions: ' + str(result.actions()) + '\n' for name, result in results)
+
+def write_output(file, results):
+    file.write(output_text(results))
+
+if __name__ == '__main__':
+
+    # Program excepts three arguments as requested in the project description. The searches run at the same time on a process pool unless
+    # --sequential is given. With --stats, the stats of every search are also written as JSON to <output_file>.stats.json, see search_stats.py.
+    parser = argparse.ArgumentParser(description='Solves the 8-puzzle in the input file with BFS, DFS, UCS, Greedy and A*.')
+    parser.add_argument('input_file')
+    parser.add_argument('output_file')
+    parser.add_argument('--algorithms', default=','.join(algorithm for name, algorithm in sections),
+                        help='comma separated subset of bfs, dfs, ucs, greedy and astar (default: all of them)')
+    parser.add_argument('--sequential', action='store_true', help='run the searches one after another in this process')
+    parser.add_argument('--stats', action='store_true', help='also write the stats of the searches to <output_file>.stats.json')
+    args = parser.parse_args()
+
+    selected = args.algorithms.split(',')
+    for algorithm in selected:
+        if algorithm not in [algorithm for name, algorithm in sections]:
+            parser.error('unknown algorithm ' + algorithm)
+
+    input_state = read_input(args.input_file)
+
+    #print(input_state)
+
+    results = solve_all(input_state, stats=args.stats, selected=selected, workers=0 if args.sequential else len(selected))
+
+    for name, result in results:
+        print(unpack_state(Node.check_actions_path(input_state, result.actions())))
+
+    with open(args.output_file, 'w') as file:
+        write_output(file, results)
+
+    if args.stats:
+        with open(args.output_file + '.stats.json', 'w') as file:
+            search_stats.write_json(file, results)
 
 
 
@@ -1,88 +1,64 @@
-from queue import PriorityQueue
 import sys
+from fringe import Heap_Fringe
+from sliding_puzzle import Board, Sliding_Puzzle_Problem
+from search_stats import Search_Stats
+import search_stats
+import bidirectional
+import pattern_database
+import lean_search
+import anytime_search
+import parallel_search
+from path_result import Path_Result, Search_Result
 
-astar_explored = set()  # The set of states that have been explored.
-astar_queue = set()  # The set of states that are in the queue.
-# The dictionary of costs of states that are in the queue. The costs are the f(n) values, i.e. the path cost + heuristic.
-# The reason for me to use a dictionary is that accessing and deleting f(n) value of a given state in the fringe is very costly since PriortyQueue is not directly support such operations.
-# If there is a child whose f(n) is lower than the node of a fringe (having same states of course), I also add the child to the fringe. So, fringe can have multiple nodes with same states but different f(n) values.
-# But after exploring one with the lowest f(n) value, with the help of the check in the line 167, others directly popped without having any effect on the result.
-astar_state_fn_cost = {}   
+# The 3x3 board of the puzzle. The states are packed by the board (see sliding_puzzle.py) with 4 bits per cell, the first cell being the
+# most significant nibble, so the state "123456000" is stored as 0x123456000. Strings are only used while parsing the input and printing the states.
+board_3x3 = Board(3, 3)
+
+def pack_state(state):
+    return int(state, 16)
 
-# The class that represents the 8-puzzle problem.
-class Eight_Puzzle_Problem_3_Blanks:
+def unpack_state(state):
+    return format(state, '09x')
+
+# The class that represents the 8-puzzle problem with three blanks. The geometry is the one of the 3x3 board; the same search also runs on a
+# Sliding_Puzzle_Problem of any other board with any number of blanks.
+class Eight_Puzzle_Problem_3_Blanks(Sliding_Puzzle_Problem):
 
     def __init__(self, initial, goal=None):
-        self.initial = initial  # Initial state.
-        self.goal = goal  # Goal state.
-
-    # Since we have multiple blank tiles, we should also specify the index of 0 along with the action.
-    def actions(self, state):
-        actions_list = []
-        blanks = [i for i in range(len(state)) if state[i] == "0"]
-        for index in blanks:
-            if index == 0:
-                actions = [0, 'R', 'D']
-            elif index == 1:
-                actions = [1, 'R', 'D', 'L']
-            elif index == 2:
-                actions = [2, 'D', 'L']
-            elif index == 3:
-                actions = [3, 'U', 'R', 'D']
-            elif index == 4:
-                actions = [4, 'U', 'R', 'D', 'L']
-            elif index == 5:
-                actions = [5, 'U', 'D', 'L']
-            elif index == 6:
-                actions = [6, 'U', 'R']
-            elif index == 7:
-                actions = [7, 'U', 'R', 'L']
-            elif index == 8:
-                actions = [8, 'U', 'L']
-            actions_list.append(actions)
-        return actions_list
-    
-    @staticmethod
-    def result(state, action, index):
-        new_state = list(state)
-        if action == 'U':
-            new_state[index], new_state[index-3] = new_state[index-3], new_state[index]
-        elif action == 'R':
-            new_state[index], new_state[index+1] = new_state[index+1], new_state[index]
-        elif action == 'D':
-            new_state[index], new_state[index+3] = new_state[index+3], new_state[index]
-        elif action == 'L':
-            new_state[index], new_state[index-1] = new_state[index-1], new_state[index]
-        return ''.join(new_state)
-    
-    def goal_test(self, state):
-        return state == self.goal
+        super().__init__(initial, goal, board_3x3, 3)
     
 
 class Node_Astar:
 
-    # Action proirty is implemented as requested in the project description.
-    action_priority = {'U': 0, 'R': 1, 'D': 2, 'L': 3}
+    # Nodes are made for every generated state, so they have no __dict__.
+    __slots__ = ('state', 'parent', 'action', 'path_cost', 'blanks', 'heuristic', 'key')
 
-    def __init__(self, state, parent=None, action=None, path_cost=0):
+    # The indices of the blanks are carried on the node (see Board.moves), so they are never searched for again while expanding.
+    # The heuristic is only computed from scratch for the initial node; children get it from their parent in expand.
+    def __init__(self, state, parent=None, action=None, path_cost=0, blanks=None, heuristic=0, priority=0):
         self.state = state
         self.parent = parent
         self.action = action
         self.path_cost = path_cost
-        self.heuristic = self.manhattan_distance(self.state) + (self.linear_conflicts(self.state) * 2)  # Heuristic is explained in the pdf.
+        self.blanks = blanks
+        self.heuristic = heuristic
+        self.key = (path_cost + heuristic, priority)
 
     def __eq__(self, other):
         return self.state == other.state
     
-    def expand(self, problem):
+    # With a heuristic function (such as the pattern databases), the heuristic of every child is computed by it instead of the delta.
+    # Moving a blank onto another blank gives the parent back, so those moves are left out (see Board.sliding_moves).
+    def expand(self, problem, heuristic=None):
         childs = []
-        action_list = problem.actions(self.state)
-        for actions in action_list:
-            index = actions.pop(0)
-            for action in actions:
-                next_state = Eight_Puzzle_Problem_3_Blanks.result(self.state, action, index)
-                next_node = Node_Astar(next_state, self, [action, index], self.path_cost + 1)
-                childs.append(next_node)
+        for action, priority, index, target, next_blanks in problem.sliding_moves(self.blanks):
+            next_state = problem.move(self.state, index, target)
+            if heuristic is None:
+                next_heuristic = self.heuristic + problem.heuristic_delta(self.state, next_state, index, target)
+            else:
+                next_heuristic = heuristic(next_state)
+            next_node = Node_Astar(next_state, self, action, self.path_cost + 1, next_blanks, next_heuristic, priority)
+            childs.append(next_node)
         return childs
     
     def __hash__(self):
@@ -97,129 +73,253 @@ class Node_Astar:
         actions.reverse()
         return actions
     
-    # For the PriorityQueue (fringe), the f(n) function is the sum of the heuristic value and the path cost. Then
-    # actions are prioritized according to the project description.
+    # For the fringe, the f(n) function is the sum of the heuristic value and the path cost. Then
+    # actions are prioritized according to the project description. The key is computed once in __init__, so the fringe only compares tuples.
     def __lt__(self, other):
-        if self.path_cost + self.heuristic < other.path_cost + other.heuristic:
-            return True
-        elif self.path_cost + self.heuristic == other.path_cost + other.heuristic:
-            return self.action_priority[self.action[0]] < self.action_priority[other.action[0]]
-        else:
-            return False
+        return self.key < other.key
     
     # Function to check the given action list is indeed a solution.
     @staticmethod
-    def check_actions_path(state, actions, file):
-        file.write("States: " + "\n")
-        Node_Astar.print_states(state, file)
-        for action in actions:
-            next_state = Eight_Puzzle_Problem_3_Blanks.result(state, action[0], action[1])
-            state = next_state
-            Node_Astar.print_states(state, file)
+    def check_actions_path(state, actions, file, board=board_3x3):
+        text, state = Node_Astar.path_text(state, actions, board)
+        file.write(text)
         return state
-    
-    # Manhattan distance heuristic function.
-    @staticmethod
-    def manhattan_distance(state):
-        goal = "123456780"
-        distance = 0
-        for i in range(1, 7):
-            dx = abs(state.index(str(i)) % 3 - goal.index(str(i)) % 3)
-            dy = abs(state.index(str(i)) // 3 - goal.index(str(i)) // 3)
-            distance += (dx + dy)
-        return distance
-    
-    # Linear conflicts heuristic function.
+
+    # The states of the path as check_actions_path writes them, built as one string, and the last state.
     @staticmethod
-    def linear_conflicts(state):
-        conflicts = 0
-        if state.index("1") == 1:
-            if state.index("2") == 0:
-                conflicts += 1
-        if state.index("1") == 3:
-            if state.index("4") == 0:
-                conflicts += 1
-        if state.index("2") == 4:
-            if state.index("5") == 1:
-                conflicts += 1
-        if state.index("2") == 2:
-            if state.index("3") == 1:
-                conflicts += 1
-        if state.index("3") == 5:
-            if state.index("6") == 2:
-                conflicts += 1
-        if state.index("4") == 4:
-            if state.index("5") == 3:
-                conflicts += 1
-        if state.index("5") == 5:
-            if state.index("6") == 4:
-                conflicts += 1
-        return conflicts
+    def path_text(state, actions, board=board_3x3):
+        lines = ["States: ", board.format(state), ""]
+        for action in actions:
+            if isinstance(action, list):
+                next_state = board.result(state, action[0], action[1])
+            else:
+                next_state = board.result(state, action)
+            state = next_state
+            lines.append(board.format(state))
+            lines.append("")
+        return "\n".join(lines) + "\n", state
     
-    # Function to print the states in a 3x3 grid.
+    # Function to print the states in a grid.
     @staticmethod
-    def print_states(state, file):
-        file.write(state[0] + " " + state[1] + " " + state[2] + "\n")
-        file.write(state[3] + " " + state[4] + " " + state[5] + "\n")
-        file.write(state[6] + " " + state[7] + " " + state[8] + "\n")
+    def print_states(state, file, board=board_3x3):
+        file.write(board.format(state) + "\n")
         file.write("\n")
+
+# Heuristic is explained in the pdf: the Manhattan distance + linear conflicts * 2, both measured to the goal of the problem.
+def conflict_heuristic(problem, state):
+    return problem.manhattan_distance(state) + problem.linear_conflicts(state) * 2
+
+# The heuristic of the initial state: the given heuristic function, or the heuristic above.
+def initial_heuristic(problem, heuristic):
+    if heuristic is not None:
+        return heuristic(problem.initial)
+    return conflict_heuristic(problem, problem.initial)
     
-# Classical A* search implementation. It is the exact implementation of the pseudo-code in the course textbook. One difference is the extra check in the line 177.
-# The reasoning for this check is explained in the astar_state_fn_cost variable's comment.
-def astar(problem):
-    initial_node = Node_Astar(problem.initial)
+# Classical A* search implementation. It is the exact implementation of the pseudo-code in the course textbook. One difference is the extra check after popping.
+# explored is the set of states that have been explored and queue is the set of states that are in the fringe. Both belong to the call, so
+# the search can be run any number of times in the same process.
+# state_fn_cost is the dictionary of costs of states that are in the queue. The costs are the f(n) values, i.e. the path cost + heuristic.
+# The reason for me to use a dictionary is that accessing and deleting f(n) value of a given state in the fringe is very costly since heaps do not directly support such operations.
+# If there is a child whose f(n) is lower than the node of a fringe (having same states of course), I also add the child to the fringe. So, fringe can have multiple nodes with same states but different f(n) values.
+# But after exploring one with the lowest f(n) value, with the help of the check after popping, others directly popped without having any effect on the result.
+# heuristic is a function of the state replacing the Manhattan distance + linear conflicts, e.g. pattern_database_heuristic().
+# With a solution_cache.Solution_Cache, the search goes through the cache, see solution_cache.py.
+def astar(problem, fringe_type=Heap_Fringe, heuristic=None, stats=None, cache=None):
+    if cache is not None:
+        base_heuristic = (lambda state: conflict_heuristic(problem, state)) if heuristic is None else heuristic
+        return cache.search(astar, problem, base_heuristic, fringe_type=fringe_type, stats=stats)
+    if stats is not None:
+        problem, heuristic, fringe_type = stats.start(problem), stats.timed(heuristic), stats.fringe_type(fringe_type)
+    explored = set()
+    queue = set()
+    state_fn_cost = {}
+    initial_node = Node_Astar(problem.initial, blanks=problem.blank_key(problem.initial), heuristic=initial_heuristic(problem, heuristic))
     if problem.goal_test(initial_node.state):
-        return initial_node
-    fringe = PriorityQueue()
-    fringe.put(initial_node)
-    astar_queue.add(initial_node.state)
-    astar_state_fn_cost[initial_node.state] = initial_node.heuristic + initial_node.path_cost
+        return Search_Result(initial_node, explored, queue, stats)
+    fringe = fringe_type()
+    fringe.put(initial_node.key, initial_node)
+    queue.add(initial_node.state)
+    state_fn_cost[initial_node.state] = initial_node.heuristic + initial_node.path_cost
     while fringe:
         node = fringe.get()
-        if node.state in astar_explored:
+        if node.state in explored:
             continue
-        astar_explored.add(node.state)
-        astar_queue.remove(node.state)
+        explored.add(node.state)
+        queue.remove(node.state)
         if problem.goal_test(node.state):
-            return node
-        for child in node.expand(problem):
-            if child.state not in astar_explored and child.state not in astar_queue:
-                fringe.put(child)
-                astar_queue.add(child.state)
-                astar_state_fn_cost[child.state] = child.heuristic + child.path_cost
-            elif child.state in astar_queue:
-                if child.heuristic + child.path_cost < astar_state_fn_cost[child.state]:
-                    fringe.put(child)
-                    astar_state_fn_cost[child.state] = child.heuristic + child.path_cost
-    return None
+            return Search_Result(node, explored, queue, stats)
+        for child in node.expand(problem, heuristic):
+            if child.state not in explored and child.state not in queue:
+                fringe.put(child.key, child)
+                queue.add(child.state)
+                state_fn_cost[child.state] = child.heuristic + child.path_cost
+            elif child.state in queue:
+                if child.heuristic + child.path_cost < state_fn_cost[child.state]:
+                    fringe.put(child.key, child)
+                    state_fn_cost[child.state] = child.heuristic + child.path_cost
+    return Search_Result(None, explored, queue, stats)
               
-# Program excepts three arguments as requested in the project description.
-if len(sys.argv) != 3:
-    print("Usage: python part1.py <input_file> <output_file>")
-    exit(1)
+# Reads the grid in the input file into a packed state of the board.
+def read_input(path, board=board_3x3):
+    with open(path, 'r') as file:
+        return board.parse(file.read())
 
+# Bidirectional searches, see bidirectional.py. The forward side of the bidirectional A* uses the same heuristic as A*, and the backward
+# side uses the Manhattan distance to the initial state, since the linear conflicts are only listed for the goal.
+def bidirectional_bfs(problem):
+    return bidirectional.bidirectional_bfs(problem)
 
-input_state = ''
-with open(sys.argv[1], 'r') as file:
-    for line in file:
-        line_numbers = ''.join(line.split())
-        input_state += line_numbers
+def bidirectional_astar(problem):
+    to_initial = problem.board.manhattan_table(problem.initial)
+    return bidirectional.bidirectional_astar(problem, lambda state: conflict_heuristic(problem, state),
+                                             lambda state: problem.board.table_distance(to_initial, state))
 
-#print(input_state)
+# Iterative deepening A*. It uses the same heuristic as A* but keeps only the current path, so the memory grows with the depth of the
+# solution instead of the number of expanded nodes. The board is the packed state and the list of blank indices, which are changed in place
+# by every move and changed back when the search returns from it; the per-depth stacks only hold integers, so no node objects are made.
+# A move that slides back the tile the previous move slid is never tried. With cache_size, the states of the current iteration are also
+# remembered with their path cost, and a state reached again with no lower cost is not searched again. The cache is cleared when it is full,
+# so the memory stays bounded. The expanded nodes are the nodes whose children were generated, summed over all iterations.
+def ida_star(problem, cache_size=50000):
+    state = problem.initial
+    heuristic = conflict_heuristic(problem, state)
+    if problem.goal_test(state):
+        return Path_Result([], 0)
+    blanks = list(problem.blank_indices(state))
+    bound = heuristic
+    expanded_nodes = 0
+    while True:
+        next_bound = None
+        cache = {}
+        path = []  # The (action, index, target) moves from the initial state.
+        states = []  # The states and heuristics before each move of the path, to undo it.
+        heuristics = []
+        move_lists = [problem.sliding_moves(tuple(blanks))]
+        positions = [0]
+        expanded_nodes += 1
+        while positions:
+            moves = move_lists[-1]
+            position = positions[-1]
+            if position == len(moves):
+                move_lists.pop()
+                positions.pop()
+                if path:
+                    action, index, target = path.pop()
+                    blanks[blanks.index(target)] = index
+                    state = states.pop()
+                    heuristic = heuristics.pop()
+                continue
+            positions[-1] = position + 1
+            action, priority, index, target, next_blanks = moves[position]
+            if path and path[-1][1] == target and path[-1][2] == index:
+                continue
+            next_state = problem.move(state, index, target)
+            next_heuristic = heuristic + problem.heuristic_delta(state, next_state, index, target)
+            path_cost = len(path) + 1
+            if path_cost + next_heuristic > bound:
+                if next_bound is None or path_cost + next_heuristic < next_bound:
+                    next_bound = path_cost + next_heuristic
+                continue
+            if cache_size:
+                seen = cache.get(next_state)
+                if seen is not None and seen <= path_cost:
+                    continue
+                if len(cache) >= cache_size:
+                    cache.clear()
+                cache[next_state] = path_cost
+            path.append((action, index, target))
+            states.append(state)
+            heuristics.append(heuristic)
+            blanks[blanks.index(index)] = target
+            state = next_state
+            heuristic = next_heuristic
+            if problem.goal_test(state):
+                return Path_Result([action for action, index, target in path], expanded_nodes)
+            expanded_nodes += 1
+            blanks.sort()
+            move_lists.append(problem.sliding_moves(tuple(blanks)))
+            positions.append(0)
+        if next_bound is None:
+            return Path_Result(None, expanded_nodes)
+        bound = next_bound
 
-Eight_Puzzle = Eight_Puzzle_Problem_3_Blanks(input_state, "123456000")
+# Memory-lean A* with the same heuristic, see lean_search.py.
+def lean_astar(problem):
+    return lean_search.lean_astar(problem, lambda state: conflict_heuristic(problem, state), problem.heuristic_delta)
 
-astar_result = astar(Eight_Puzzle)
+# Weighted A* and the anytime ARA* with the same heuristic, see anytime_search.py. The results also have a proven bound on how far
+# the path cost can be from the optimal one.
+def weighted_astar(problem, weight=2.0, heuristic=None, fringe_type=Heap_Fringe):
+    return anytime_search.weighted_astar(problem, Node_Astar, initial_heuristic(problem, heuristic), heuristic, weight, fringe_type)
 
-with open(sys.argv[2], 'w') as file:
-    Node_Astar.check_actions_path(input_state, astar_result.actions(), file)
-    file.write("Path Cost: " + str(astar_result.path_cost) + "\n")
-    file.write("Expanded Nodes: " + str(len(astar_explored) + len(astar_queue)) + "\n")
+def ara_star(problem, weight=3.0, step=0.5, time_limit=None, heuristic=None, fringe_type=Heap_Fringe):
+    return anytime_search.ara_star(problem, Node_Astar, initial_heuristic(problem, heuristic), heuristic, weight, step, time_limit, fringe_type)
 
+# Hash-distributed A* on several processes with the same heuristic, see parallel_search.py.
+def hda_star(problem, workers=None, batch_size=256):
+    return parallel_search.hda_star(problem, 'conflicts', workers, batch_size)
 
-    
+algorithms = {'astar': astar, 'bidirectional_bfs': bidirectional_bfs, 'bidirectional_astar': bidirectional_astar, 'ida_star': ida_star,
+              'lean_astar': lean_astar, 'weighted_astar': weighted_astar, 'ara_star': ara_star,
+              'hda_star': hda_star}
 
-    
-    
+# Additive pattern databases of the tiles {1, 2, 3} and {4, 5, 6}, see pattern_database.py.
+def pattern_database_heuristic(goal="123456000"):
+    if isinstance(goal, str):
+        goal = pack_state(goal)
+    return pattern_database.additive_heuristic(board_3x3, goal, ((1, 2, 3), (4, 5, 6)), 'part2')
+
+# Library entry point. The state and the goal can be given as strings like "123456000" or as packed states.
+# heuristic='pattern_database' selects the pattern databases for A*.
+# With board, the puzzle is solved on that board instead of the 3x3 one, with as many blanks as the state has,
+# e.g. solve("1 2 3 4 5 6 7 8 9 10 0 11 12 13 0 14", board=Board(4, 4)).
+# Without a goal, the goal is the tiles in order followed by the blanks.
+# Any other goal is relabeled to the goal with the same blanks and the tiles in order (see Board.relabeled), so all the goals with the blanks
+# in the same cells share the heuristic tables, the pattern databases and the solution cache. The actions are the same for both, so the
+# result is the one of the given goal. A heuristic function given by the caller is computed on the states as given, so it turns this off.
+# Every call builds its own problem and search containers, so it can be called from long-lived processes as many times as needed.
+def solve(state, algorithm='astar', goal=None, board=board_3x3, **options):
+    if isinstance(state, str):
+        state = board.parse(state)
+    if goal is None:
+        goal = board.goal_state(3 if board is board_3x3 else len(board.blank_indices(state)))
+    elif isinstance(goal, str):
+        goal = board.parse(goal)
+    if not callable(options.get('heuristic')):
+        state, goal = board.relabeled(state, goal)
+    if options.get('heuristic') == 'pattern_database':
+        if board is not board_3x3:
+            raise ValueError('the pattern databases are only set up for the 3x3 board')
+        options['heuristic'] = pattern_database_heuristic(goal)
+    problem = Eight_Puzzle_Problem_3_Blanks(state, goal) if board is board_3x3 else Sliding_Puzzle_Problem(state, goal, board)
+    return algorithms[algorithm](problem, **options)
+
+# The text of the output file for the result. It is built as one string, so the file is written at once.
+def output_text(input_state, result, board=board_3x3):
+    text, state = Node_Astar.path_text(input_state, result.actions(), board)
+    return text + "Path Cost: " + str(result.path_cost) + "\n" + "Expanded Nodes: " + str(result.expanded_nodes) + "\n"
+
+def write_output(file, input_state, result, board=board_3x3):
+    file.write(output_text(input_state, result, board))
+
+if __name__ == '__main__':
+
+    # Program excepts three arguments as requested in the project description. With --stats, the stats of the search are also
+    # written as JSON to <output_file>.stats.json, see search_stats.py.
+    if len(sys.argv) not in (3, 4) or (len(sys.argv) == 4 and sys.argv[3] != '--stats'):
+        print("Usage: python part2.py <input_file> <output_file> [--stats]")
+        exit(1)
+
+
+    input_state = read_input(sys.argv[1])
+
+    #print(input_state)
+
+    result = solve(input_state, stats=Search_Stats()) if len(sys.argv) == 4 else solve(input_state)
 
+    with open(sys.argv[2], 'w') as file:
+        write_output(file, input_state, result)
 
+    if len(sys.argv) == 4:
+        with open(sys.argv[2] + '.stats.json', 'w') as file:
+            search_stats.write_json(file, [('A*', result)])
@@ -0,0 +1,32 @@
+# The outcome of a search. The explored and queue sets belong to the search call that made the result, so only their sizes are kept here.
+# The node is None if the goal cannot be reached.
+class Search_Result:
+
+    def __init__(self, node, explored, queue, stats=None):
+        self.node = node
+        self.expanded_nodes = len(explored) + len(queue)
+        self.path_cost = node.path_cost if node is not None else None
+        self.stats = stats  # The Search_Stats of the search, if it was given one.
+        self.path_actions = None
+        if stats is not None:
+            stats.finish(explored, queue)
+
+    # The actions are taken from the parent chain once and kept, since the output asks for them more than once.
+    def actions(self):
+        if self.path_actions is None:
+            self.path_actions = self.node.actions()
+        return self.path_actions
+
+
+# The outcome of a search that keeps its path as a list of actions instead of a chain of nodes (bidirectional search, IDA*, ...).
+# It has the same interface as Search_Result. The actions are None if the goal cannot be reached.
+class Path_Result:
+
+    def __init__(self, path_actions, expanded_nodes, stats=None):
+        self.path_actions = path_actions
+        self.expanded_nodes = expanded_nodes
+        self.path_cost = len(path_actions) if path_actions is not None else None
+        self.stats = stats
+
+    def actions(self):
+        return self.path_actions
@@ -0,0 +1,151 @@
+import os
+import tempfile
+from collections import deque
+from itertools import combinations
+from math import comb, perm
+
+# Disjoint additive pattern databases. A pattern is a group of tiles; the other tiles are abstracted as indistinguishable tiles, while the
+# blanks are kept. The database holds, for every placement of the pattern tiles and the blanks, the least number of moves of pattern tiles
+# needed to reach the goal placement. Moves of the other tiles are free in the abstraction, so every real move is counted by at most one
+# database, and the sum of the databases of disjoint patterns is still an admissible heuristic.
+#
+# The databases are built by a breadth-first search backwards from the abstract goal (0-1 BFS, since moving an abstracted tile costs
+# nothing), stored as byte arrays on disk next to this file and only loaded the first time they are used.
+
+# Byte of the placements that cannot reach the goal.
+UNREACHABLE = 255
+
+
+class Pattern_Database:
+
+    # board is the sliding_puzzle.Board of the puzzle, goal is the packed goal state and pattern is the tuple of tiles of the database.
+    def __init__(self, board, goal, pattern, path):
+        self.board = board
+        self.pattern = pattern
+        self.path = path
+        self.cells = board.cells
+        self.shifts = board.shifts
+        self.mask = board.mask
+        self.slots = [-1] * (self.mask + 1)  # slots[tile] is the position of the tile in the pattern, or -1 if it is not in the pattern.
+        for slot, tile in enumerate(pattern):
+            self.slots[tile] = slot
+        self.other = max(value for value in range(1, self.mask + 1) if value not in pattern)  # Value of the tiles that are not in the pattern.
+        self.goal = self.abstract(goal)
+        self.blank_count = len(board.blank_indices(goal))
+        # The placement of the pattern tiles is ranked as a partial permutation of the cells and the blanks as a combination of the cells,
+        # so the index of a state is found with one pass over its cells.
+        self.blank_ranks = {}
+        for blanks in combinations(range(self.cells), self.blank_count):
+            self.blank_ranks[sum(1 << index for index in blanks)] = sum(comb(index, k + 1) for k, index in enumerate(blanks))
+        self.blank_combinations = comb(self.cells, self.blank_count)
+        self.size = perm(self.cells, len(pattern)) * self.blank_combinations
+        self.table = None
+
+    # The state with every tile that is not in the pattern replaced by the value of the other tiles.
+    def abstract(self, state):
+        for shift in self.shifts:
+            value = (state >> shift) & self.mask
+            if value != 0 and self.slots[value] < 0:
+                state += (self.other - value) << shift
+        return state
+
+    def index(self, state):
+        positions = [0] * len(self.pattern)
+        mask = 0
+        for index in range(self.cells):
+            value = (state >> self.shifts[index]) & self.mask
+            if value == 0:
+                mask |= 1 << index
+            elif self.slots[value] >= 0:
+                positions[self.slots[value]] = index
+        rank = 0
+        used = 0
+        for slot, position in enumerate(positions):
+            rank = rank * (self.cells - slot) + position - bin(used & ((1 << position) - 1)).count('1')
+            used |= 1 << position
+        return rank * self.blank_combinations + self.blank_ranks[mask]
+
+    def build(self):
+        neighbors = self.board.neighbors
+        move = self.board.move
+        distances = {self.goal: 0}
+        frontier = deque([(self.goal, 0)])
+        while frontier:
+            state, distance = frontier.popleft()
+            if distances[state] < distance:
+                continue
+            for index in range(self.cells):
+                if (state >> self.shifts[index]) & self.mask != 0:
+                    continue
+                for action, target in neighbors[index]:
+                    tile = (state >> self.shifts[target]) & self.mask
+                    if tile == 0:
+                        continue
+                    next_distance = distance if tile == self.other else distance + 1
+                    next_state = move(state, index, target)
+                    if next_distance < distances.get(next_state, UNREACHABLE):
+                        distances[next_state] = next_distance
+                        if tile == self.other:
+                            frontier.appendleft((next_state, next_distance))
+                        else:
+                            frontier.append((next_state, next_distance))
+        table = bytearray([UNREACHABLE]) * self.size
+        for state, distance in distances.items():
+            table[self.index(state)] = distance
+        # Written to a file of its own first, so processes building the same table at once do not write over each other's files and a
+        # table under the final name is always complete.
+        descriptor, temporary_path = tempfile.mkstemp(suffix='.tmp', prefix=os.path.basename(self.path) + '.',
+                                                      dir=os.path.dirname(os.path.abspath(self.path)))
+        try:
+            with os.fdopen(descriptor, 'wb') as file:
+                file.write(table)
+            os.chmod(temporary_path, 0o644)
+            os.replace(temporary_path, self.path)
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+        return len(distances)
+
+    # Reads the saved table, building it first if it does not exist yet.
+    def load(self):
+        if self.table is None:
+            if not os.path.exists(self.path) or os.path.getsize(self.path) != self.size:
+                self.build()
+            with open(self.path, 'rb') as file:
+                self.table = file.read()
+        return self
+
+    def distance(self, state):
+        if self.table is None:
+            self.load()
+        return self.table[self.index(state)]
+
+
+# Sum of disjoint pattern databases, used as the heuristic function of a search.
+class Additive_Heuristic:
+
+    def __init__(self, databases):
+        self.databases = databases
+
+    def __call__(self, state):
+        distance = 0
+        for database in self.databases:
+            distance += database.distance(state)
+        return distance
+
+
+# The heuristics are kept once created, so the tables are read from disk only once per process.
+heuristics = {}
+
+# Additive heuristic of the given disjoint patterns for the goal. name is used in the file names of the databases.
+def additive_heuristic(board, goal, patterns, name):
+    key = (name, goal, patterns)
+    if key not in heuristics:
+        directory = os.path.dirname(os.path.abspath(__file__))
+        databases = []
+        for pattern in patterns:
+            goal_text = format(goal, '0' + str((board.bits * board.cells + 3) // 4) + 'x')  # With its leading zeros, e.g. '123456000'.
+            path = os.path.join(directory, 'pdb_' + name + '_' + goal_text + '_' + ''.join(format(tile, 'x') for tile in pattern) + '.bin')
+            databases.append(Pattern_Database(board, goal, pattern, path))
+        heuristics[key] = Additive_Heuristic(databases)
+    return heuristics[key]
@@ -0,0 +1,173 @@
+import copy
+import json
+import time
+from collections import deque
+
+# Instrumentation of the searches. A Search_Stats given to a search (solve(state, stats=Search_Stats())) is filled while it runs, and the
+# result keeps it as result.stats. Without it, the searches run exactly as before: nothing is counted or timed in their loops.
+#
+# The counting is done by wrappers that the search puts around the problem, the heuristic and the fringe when a Search_Stats is given:
+# problem.moves (or problem.sliding_moves) is called once per expanded node and problem.move once per generated node, and the fringe counts its
+# puts and pops. The moves of a blank onto another blank that problem.sliding_moves leaves out are counted as skipped moves.
+# The other numbers follow from those and the explored and queue sets at the end, since every state enters the queue once:
+#   duplicates discarded = generated - (puts - 1)       children that were not put in the fringe
+#   re-insertions        = puts - (explored + queue)    children put again with a lower f(n) (for DFS, pushed again)
+#   stale pops           = pops - explored              entries popped for a state that was already explored
+#
+# The time is split between the fringe operations, the heuristic (the heuristic deltas or the heuristic function) and the expansion, which
+# is the rest of the main loop (generating the children and the explored and queue checks). The timers themselves take time, so an
+# instrumented search is slower than a plain one; the shares are what to look at, not the absolute times.
+#
+# profiler is any object with enable() and disable(), e.g. cProfile.Profile() or a sampling profiler, and it is enabled around the main loop.
+
+
+class Search_Stats:
+
+    fields = ('generated', 'expanded', 'skipped_moves', 'duplicates', 'stale_pops', 'reinsertions', 'peak_fringe', 'puts', 'pops',
+              'total_seconds', 'expansion_seconds', 'heuristic_seconds', 'fringe_seconds')
+
+    def __init__(self, profiler=None):
+        self.profiler = profiler
+        self.generated = 0
+        self.expanded = 0
+        self.skipped_moves = 0
+        self.duplicates = 0
+        self.stale_pops = 0
+        self.reinsertions = 0
+        self.peak_fringe = 0
+        self.puts = 0
+        self.pops = 0
+        self.total_seconds = 0.0
+        self.expansion_seconds = 0.0
+        self.heuristic_seconds = 0.0
+        self.fringe_seconds = 0.0
+        self.start_time = None
+
+    # Called by the search before it starts. Returns the problem to search with, wrapped for counting. The problem is copied,
+    # so the problem of the caller is not changed.
+    def start(self, problem):
+        problem = copy.copy(problem)
+        moves = problem.moves
+        sliding_moves = problem.sliding_moves
+        move = problem.move
+
+        def counted_moves(blanks):
+            self.expanded += 1
+            return moves(blanks)
+
+        def counted_sliding_moves(blanks):
+            self.expanded += 1
+            sliding = sliding_moves(blanks)
+            self.skipped_moves += len(moves(blanks)) - len(sliding)
+            return sliding
+
+        def counted_move(state, index, target):
+            self.generated += 1
+            return move(state, index, target)
+
+        problem.moves = counted_moves
+        problem.sliding_moves = counted_sliding_moves
+        problem.move = counted_move
+        problem.manhattan_delta = self.timed(problem.manhattan_delta)
+        problem.heuristic_delta = self.timed(problem.heuristic_delta)
+        if self.profiler is not None:
+            self.profiler.enable()
+        self.start_time = time.perf_counter()
+        return problem
+
+    # The heuristic function timed as heuristic time. None stays None.
+    def timed(self, function):
+        if function is None:
+            return None
+
+        def timed_function(*args):
+            start = time.perf_counter()
+            value = function(*args)
+            self.heuristic_seconds += time.perf_counter() - start
+            return value
+        return timed_function
+
+    # The fringe type whose fringes are counted and timed.
+    def fringe_type(self, fringe_type):
+        return lambda: Counted_Fringe(self, fringe_type())
+
+    # The FIFO/LIFO fringe of BFS and DFS with the given items in it.
+    def deque(self, items):
+        return Counted_Deque(self, items)
+
+    # Called by Search_Result when the search returns.
+    def finish(self, explored, queue):
+        self.total_seconds = time.perf_counter() - self.start_time
+        if self.profiler is not None:
+            self.profiler.disable()
+        self.duplicates = self.generated - max(self.puts - 1, 0)
+        self.reinsertions = max(self.puts - len(explored) - len(queue), 0)
+        self.stale_pops = self.pops - len(explored)
+        self.expansion_seconds = self.total_seconds - self.heuristic_seconds - self.fringe_seconds
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in self.fields}
+
+
+# Counts and times the operations of a Heap_Fringe or a Bucket_Fringe.
+class Counted_Fringe:
+
+    def __init__(self, stats, fringe):
+        self.stats = stats
+        self.fringe = fringe
+
+    def put(self, key, item):
+        start = time.perf_counter()
+        self.fringe.put(key, item)
+        self.stats.fringe_seconds += time.perf_counter() - start
+        self.stats.puts += 1
+        if len(self.fringe) > self.stats.peak_fringe:
+            self.stats.peak_fringe = len(self.fringe)
+
+    def get(self):
+        start = time.perf_counter()
+        item = self.fringe.get()
+        self.stats.fringe_seconds += time.perf_counter() - start
+        self.stats.pops += 1
+        return item
+
+    def __len__(self):
+        return len(self.fringe)
+
+
+# The same for the deque of BFS and DFS.
+class Counted_Deque(deque):
+
+    def __init__(self, stats, items):
+        super().__init__()
+        self.stats = stats
+        for item in items:
+            self.append(item)
+
+    def append(self, item):
+        start = time.perf_counter()
+        super().append(item)
+        self.stats.fringe_seconds += time.perf_counter() - start
+        self.stats.puts += 1
+        if len(self) > self.stats.peak_fringe:
+            self.stats.peak_fringe = len(self)
+
+    def pop(self):
+        start = time.perf_counter()
+        item = super().pop()
+        self.stats.fringe_seconds += time.perf_counter() - start
+        self.stats.pops += 1
+        return item
+
+    def popleft(self):
+        start = time.perf_counter()
+        item = super().popleft()
+        self.stats.fringe_seconds += time.perf_counter() - start
+        self.stats.pops += 1
+        return item
+
+
+# Writes the stats of named results, e.g. the (name, Search_Result) pairs of part1.solve_all, as one JSON object keyed by the names.
+def write_json(file, results):
+    json.dump({name: result.stats.as_dict() for name, result in results}, file, indent=1)
+    file.write('\n')
@@ -0,0 +1,321 @@
+# Sliding puzzles of any shape with any number of blanks. part1.py and part2.py solve the 3x3 board, and the same searches run on a 4x4 or a
+# 5x5 board through the classes here.
+#
+# A state is packed into a single integer with the same number of bits per cell, the first cell being the most significant. 4 bits are enough
+# for up to 16 cells, so a 3x3 state keeps its old form (the state "123456780" is 0x123456780) and a 4x4 state fits in 64 bits; boards with
+# more cells take 5 bits per cell, which covers the 24-puzzle. Everything that depends on the shape of the board (bit offsets of the cells,
+# neighbors of every cell, move lists, heuristic tables) is computed once per board and kept on it.
+
+# Action proirty is implemented as requested in the project description.
+action_priority = {'U': 0, 'R': 1, 'D': 2, 'L': 3}
+
+# For every blank position, the (action, target) pairs in the U/R/D/L priority order, where target is the index of the tile that slides into the blank.
+# It is built once per board shape, so expanding a node is a table lookup plus a swap instead of going through the if-chains.
+def build_neighbors(rows, cols):
+    neighbors = []
+    for index in range(rows * cols):
+        row, col = divmod(index, cols)
+        moves = []
+        if row > 0:
+            moves.append(('U', index - cols))
+        if col < cols - 1:
+            moves.append(('R', index + 1))
+        if row < rows - 1:
+            moves.append(('D', index + cols))
+        if col > 0:
+            moves.append(('L', index - 1))
+        neighbors.append(tuple(moves))
+    return tuple(neighbors)
+
+# The blank indices of the state reached by moving the blank at index to target, kept in ascending order.
+# Moving a blank onto another blank gives the same state back, so the blanks do not change either.
+def move_blanks(blanks, index, target):
+    if target in blanks:
+        return blanks
+    return tuple(sorted(target if blank == index else blank for blank in blanks))
+
+
+class Board:
+
+    def __init__(self, rows, cols):
+        self.rows = rows
+        self.cols = cols
+        self.cells = rows * cols
+        self.bits = max(4, (self.cells - 1).bit_length())  # Bits per cell, enough for the largest tile.
+        self.mask = (1 << self.bits) - 1
+        self.shifts = tuple(self.bits * (self.cells - 1 - index) for index in range(self.cells))  # Bit offset of every cell.
+        self.neighbors = build_neighbors(rows, cols)
+        self.moves_cache = {}
+        self.sliding_moves_cache = {}
+        self.tables_cache = {}
+
+    def pack(self, values):
+        state = 0
+        for value in values:
+            state = (state << self.bits) | value
+        return state
+
+    def unpack(self, state):
+        return [(state >> shift) & self.mask for shift in self.shifts]
+
+    # Parses a state written as one number per cell separated by whitespace, like the input files. A state written without separators,
+    # like "123456780", is read one character per cell, with the letters standing for the tiles above 9 ("123456789abcdef0").
+    # Raises ValueError when the text does not give every cell of the board or has a value that is not on it.
+    def parse(self, text):
+        tokens = text.split()
+        if len(tokens) == self.cells:
+            values = [int(token) for token in tokens]
+        elif len(''.join(tokens)) == self.cells:
+            values = [int(character, 36) for character in ''.join(tokens)]
+        else:
+            raise ValueError('the state must have ' + str(self.cells) + ' cells: ' + repr(text))
+        if not all(0 <= value < self.cells for value in values):
+            raise ValueError('the values of the state must be below ' + str(self.cells) + ': ' + repr(text))
+        return self.pack(values)
+
+    # Whether the goal can be reached from the state. With one blank, every move swaps the blank with a tile, so the parity of the
+    # permutation from the state to the goal changes with every move, as does the parity of the distance of the blank to its goal cell:
+    # the two parities have to be the same. With more blanks, every state with the same tiles can reach the goal.
+    def solvable(self, state, goal):
+        values = self.unpack(state)
+        goal_values = self.unpack(goal)
+        if sorted(values) != sorted(goal_values):
+            return False
+        if values.count(0) != 1:
+            return True
+        goal_index = dict((value, index) for index, value in enumerate(goal_values))
+        permutation = [goal_index[value] for value in values]
+        swaps = 0
+        seen = [False] * self.cells
+        for start in range(self.cells):
+            cell = start
+            length = 0
+            while not seen[cell]:
+                seen[cell] = True
+                cell = permutation[cell]
+                length += 1
+            swaps += max(length - 1, 0)  # A cycle of the permutation is length - 1 swaps.
+        blank = values.index(0)
+        goal_blank = goal_values.index(0)
+        distance = abs(blank % self.cols - goal_blank % self.cols) + abs(blank // self.cols - goal_blank // self.cols)
+        return swaps % 2 == distance % 2
+
+    # The state as a grid, one row per line. The numbers are aligned when some tiles have two digits.
+    def format(self, state):
+        values = self.unpack(state)
+        width = len(str(self.cells - 1))
+        return '\n'.join(' '.join(str(value).rjust(width) for value in values[row * self.cols:(row + 1) * self.cols]) for row in range(self.rows))
+
+    # The goal with the tiles in order and the blanks at the end, e.g. "123456780" for one blank and "123456000" for three blanks on the 3x3 board.
+    def goal_state(self, blank_count=1):
+        return self.pack(list(range(1, self.cells - blank_count + 1)) + [0] * blank_count)
+
+    # The goal with the blanks in the same cells as the given one and the tiles 1, 2, ... in order in the other cells. The goals with their
+    # blanks in the same cells are the same puzzle with other labels on the tiles, so they can all be solved against this one (see relabeled).
+    def canonical_goal(self, goal):
+        values = []
+        tile = 0
+        for value in self.unpack(goal):
+            if value == 0:
+                values.append(0)
+            else:
+                tile += 1
+                values.append(tile)
+        return self.pack(values)
+
+    # The state and the goal with the tiles relabeled so that the goal becomes its canonical goal. The actions only say where the blanks
+    # go, so the relabeled state is solved by exactly the same actions as the state, and the searches take the same steps on it; but the
+    # heuristic tables, the pattern databases, the distance oracles and the solution cache of the canonical goal serve every such goal.
+    # The state and the goal are returned unchanged if they cannot be relabeled, i.e. their tiles are not the same distinct values.
+    def relabeled(self, state, goal):
+        goal_values = self.unpack(goal)
+        tiles = [value for value in goal_values if value != 0]
+        if len(set(tiles)) != len(tiles) or sorted(self.unpack(state)) != sorted(goal_values):
+            return state, goal
+        labels = [0] * (self.mask + 1)
+        for value, label in zip(goal_values, self.unpack(self.canonical_goal(goal))):
+            labels[value] = label
+        return self.pack([labels[value] for value in self.unpack(state)]), self.canonical_goal(goal)
+
+    # Indices of the blanks in ascending order, which is also the order their actions are tried in.
+    def blank_indices(self, state):
+        return tuple(index for index in range(self.cells) if (state >> self.shifts[index]) & self.mask == 0)
+
+    # Returns a list whose i'th element is the index of the tile i in the given state. Blanks are not tracked.
+    def tile_positions(self, state):
+        positions = [0] * self.cells
+        for index in range(self.cells):
+            positions[(state >> self.shifts[index]) & self.mask] = index
+        return positions
+
+    # Sliding a tile into the blank only moves its bits, so the new state is obtained with two shifts instead of a list swap.
+    # Moving a blank onto another blank gives the same state back.
+    def move(self, state, index, target):
+        tile = (state >> self.shifts[target]) & self.mask
+        return state - (tile << self.shifts[target]) + (tile << self.shifts[index])
+
+    # The state reached by the action of the blank at index. index can be left out when the state has a single blank.
+    def result(self, state, action, index=None):
+        if index is None:
+            index = self.blank_indices(state)[0]
+        for neighbor_action, target in self.neighbors[index]:
+            if neighbor_action == action:
+                return self.move(state, index, target)
+
+    # The moves from a position of the blanks as (action, action priority, index, target, next blanks), in the order the children are generated.
+    # blanks is the index of the blank for a puzzle with one blank, whose actions are plain letters like 'U'. Otherwise it is the tuple of the blank
+    # indices, and since we have multiple blank tiles, the index of the blank is also given along with the action, like ['U', 3].
+    # The lists are kept per position once built, so the actions are shared by the nodes and must not be changed.
+    def moves(self, blanks):
+        moves = self.moves_cache.get(blanks)
+        if moves is None:
+            if isinstance(blanks, int):
+                moves = tuple((action, action_priority[action], blanks, target, target) for action, target in self.neighbors[blanks])
+            else:
+                moves = tuple(([action, index], action_priority[action], index, target, move_blanks(blanks, index, target))
+                              for index in blanks for action, target in self.neighbors[index])
+            self.moves_cache[blanks] = moves
+        return moves
+
+    # The moves of Board.moves without the moves of a blank onto another blank, which give the same state back, so the searches make no child
+    # for them. The other moves keep their order and their actions. The lists are kept per set of blanks once built. This is the table of
+    # moves of every search that slides tiles, so blanks can also be a tuple with a single index, for the searches that always have tuples.
+    def sliding_moves(self, blanks):
+        moves = self.sliding_moves_cache.get(blanks)
+        if moves is None:
+            if isinstance(blanks, int):
+                moves = self.moves(blanks)
+            else:
+                moves = tuple(move for move in self.moves(blanks) if move[3] not in blanks)
+            self.sliding_moves_cache[blanks] = moves
+        return moves
+
+    # manhattan_table[tile][index] is the Manhattan distance between the index and the place of the tile in the goal state.
+    # The rows of the blanks are all zeros, since blanks are not counted.
+    def manhattan_table(self, goal):
+        goal_positions = self.tile_positions(goal)
+        tiles = set(self.unpack(goal)) - {0}
+        table = [[0] * self.cells for tile in range(self.cells)]
+        for tile in tiles:
+            for index in range(self.cells):
+                table[tile][index] = abs(index % self.cols - goal_positions[tile] % self.cols) + abs(index // self.cols - goal_positions[tile] // self.cols)
+        return tuple(tuple(row) for row in table)
+
+    # Sum of the distances of the tiles of the state in a table built by manhattan_table.
+    def table_distance(self, table, state):
+        distance = 0
+        for index in range(self.cells):
+            distance += table[(state >> self.shifts[index]) & self.mask][index]
+        return distance
+
+    # Linear conflicts of the goal. Each entry (index_a, tile_a, index_b, tile_b) is a conflict that is counted when tile_a is at index_a
+    # and tile_b is at index_b, i.e. two tiles that are next to each other in their goal row or column have to pass each other.
+    def conflict_pairs(self, goal):
+        values = self.unpack(goal)
+        pairs = []
+        for index in range(self.cells):
+            if values[index] == 0:
+                continue
+            for action, target in self.neighbors[index]:
+                if action in ('R', 'D') and values[target] != 0:
+                    pairs.append((target, values[index], index, values[target]))
+        return tuple(pairs)
+
+    # For every pair of cells (index, target), the conflict pairs that involve one of the two cells.
+    def conflicts_touching(self, pairs):
+        table = []
+        for index in range(self.cells):
+            row = []
+            for target in range(self.cells):
+                row.append(tuple(pair for pair in pairs if pair[0] in (index, target) or pair[2] in (index, target)))
+            table.append(tuple(row))
+        return tuple(table)
+
+    # The Manhattan table, the conflict pairs and the conflicts touching every move for the goal, kept per goal once built.
+    def heuristic_tables(self, goal):
+        tables = self.tables_cache.get(goal)
+        if tables is None:
+            pairs = self.conflict_pairs(goal)
+            tables = (self.manhattan_table(goal), pairs, self.conflicts_touching(pairs))
+            self.tables_cache[goal] = tables
+        return tables
+
+
+# The sliding puzzle problem on a board. The number of blanks is taken from the goal (or the initial state if there is no goal) unless it is given.
+class Sliding_Puzzle_Problem:
+
+    def __init__(self, initial, goal, board, blank_count=None):
+        self.initial = initial  # Initial state.
+        self.goal = goal  # Goal state.
+        self.board = board
+        self.neighbors = board.neighbors
+        self.move = board.move
+        self.moves = board.moves
+        self.sliding_moves = board.sliding_moves
+        self.shifts = board.shifts
+        self.mask = board.mask
+        if blank_count is None:
+            blank_count = len(board.blank_indices(goal if goal is not None else initial))
+        self.blank_count = blank_count
+        if goal is not None:
+            self.manhattan_table, self.conflict_pairs, self.conflicts_touching = board.heuristic_tables(goal)
+
+    def blank_indices(self, state):
+        return self.board.blank_indices(state)
+
+    def blank_index(self, state):
+        return self.board.blank_indices(state)[0]
+
+    # The blanks as the nodes carry them: the index of the blank for a puzzle with one blank, the tuple of blank indices otherwise. See Board.moves.
+    def blank_key(self, state):
+        if self.blank_count == 1:
+            return self.blank_index(state)
+        return self.blank_indices(state)
+
+    # With multiple blanks, the index of the blank is given first and its actions after it.
+    def actions(self, state):
+        if self.blank_count == 1:
+            return [action for action, target in self.neighbors[self.blank_index(state)]]
+        return [[index] + [action for action, target in self.neighbors[index]] for index in self.blank_indices(state)]
+
+    # The (action, next state) pairs of the state in the action priority order. The searches expand nodes through the move lists
+    # directly; this is for the tools that work on bare states, such as distance_oracle.py.
+    def successors(self, state):
+        return [(action, self.move(state, index, target)) for action, priority, index, target, next_blanks in self.moves(self.blank_key(state))]
+
+    # The state reached by the action, given in the same form as the actions of the moves.
+    def result(self, state, action):
+        if self.blank_count == 1:
+            return self.board.result(state, action)
+        return self.board.result(state, action[0], action[1])
+
+    def goal_test(self, state):
+        return state == self.goal
+
+    def manhattan_distance(self, state):
+        return self.board.table_distance(self.manhattan_table, state)
+
+    def linear_conflicts(self, state):
+        return self.count_conflicts(state, self.conflict_pairs)
+
+    def count_conflicts(self, state, pairs):
+        conflicts = 0
+        for index_a, tile_a, index_b, tile_b in pairs:
+            if (state >> self.shifts[index_a]) & self.mask == tile_a and (state >> self.shifts[index_b]) & self.mask == tile_b:
+                conflicts += 1
+        return conflicts
+
+    # A move only displaces one tile, so the heuristic of a child is the one of its parent plus the change in the distance of that tile.
+    def manhattan_delta(self, state, index, target):
+        row = self.manhattan_table[(state >> self.shifts[target]) & self.mask]
+        return row[index] - row[target]
+
+    # The same for the Manhattan distance + linear conflicts * 2: only the conflict pairs that involve one of the two cells the move swaps
+    # can change, so they are the only ones counted again.
+    def heuristic_delta(self, state, next_state, index, target):
+        row = self.manhattan_table[(state >> self.shifts[target]) & self.mask]
+        pairs = self.conflicts_touching[index][target]
+        if not pairs:
+            return row[index] - row[target]
+        conflicts = self.count_conflicts(next_state, pairs) - self.count_conflicts(state, pairs)
+        return row[index] - row[target] + conflicts * 2
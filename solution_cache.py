@@ -0,0 +1,129 @@
+import copy
+import json
+import os
+import sqlite3
+import time
+
+from path_result import Path_Result
+
+# Persistent cache of optimal solutions, kept in a sqlite file so it is shared by every process that solves puzzles and survives restarts.
+# An entry is keyed by the board, the goal and the packed state, and holds the optimal distance of the state and its optimal actions.
+# When a solution is stored, every state on its path is stored too with the rest of the path, since every suffix of an optimal path is
+# an optimal path of its own first state.
+#
+# A* uses the cache in two ways (solve(state, cache=Solution_Cache())): a cached initial state is answered without searching, and during the
+# search the heuristic of a cached state is its exact distance. A cached state is then treated like a goal, so the search stops as soon as it
+# pops one and its cached actions are appended to the path. Cached states are never expanded, so the heuristic stays consistent on every
+# edge the search actually follows and the path is still optimal.
+#
+# The number of entries is capped; when a store goes over the cap, the least recently used entries are removed.
+
+default_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'solution_cache.sqlite')
+
+
+class Solution_Cache:
+
+    def __init__(self, path=default_path, max_entries=100000):
+        self.path = path
+        self.max_entries = max_entries
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS solutions (puzzle TEXT, goal TEXT, state TEXT, distance INTEGER, actions TEXT, '
+                                'used INTEGER, PRIMARY KEY (puzzle, goal, state))')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS solutions_used ON solutions (used)')
+        self.connection.commit()
+        self.hits = 0  # Initial states answered from the cache.
+        self.misses = 0  # Initial states that had to be searched.
+        self.exact_hits = 0  # Exact distances used as heuristic values during the searches.
+        self.distance_tables = {}  # The cached distances of every (puzzle, goal) that has been searched, loaded once.
+
+    # The puzzle and the goal of the problem as stored in the file. States are stored in hex, since the packed states of the larger
+    # boards do not fit in the integers of sqlite.
+    @staticmethod
+    def key(problem):
+        return str(problem.board.rows) + 'x' + str(problem.board.cols), format(problem.goal, 'x')
+
+    # The cached actions of the state, without counting it as a hit or a miss. Marks the entry as used.
+    def fetch(self, problem, state):
+        puzzle, goal = self.key(problem)
+        row = self.connection.execute('SELECT actions FROM solutions WHERE puzzle = ? AND goal = ? AND state = ?',
+                                      (puzzle, goal, format(state, 'x'))).fetchone()
+        if row is None:
+            return None
+        self.connection.execute('UPDATE solutions SET used = ? WHERE puzzle = ? AND goal = ? AND state = ?',
+                                (time.time_ns(), puzzle, goal, format(state, 'x')))
+        self.connection.commit()
+        return json.loads(row[0])
+
+    # The cached optimal actions of the state, or None if it is not cached.
+    def lookup(self, problem, state):
+        if problem.goal_test(state):
+            return []
+        actions = self.fetch(problem, state)
+        if actions is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return actions
+
+    # The exact distances of the cached states to the goal of the problem, the goal included.
+    def distances(self, problem):
+        key = self.key(problem)
+        if key not in self.distance_tables:
+            rows = self.connection.execute('SELECT state, distance FROM solutions WHERE puzzle = ? AND goal = ?', key)
+            table = {int(state, 16): distance for state, distance in rows}
+            table[problem.goal] = 0
+            self.distance_tables[key] = table
+        return self.distance_tables[key]
+
+    # Stores the optimal actions from the state and the rest of them for every state on the path.
+    def store(self, problem, state, actions):
+        puzzle, goal = self.key(problem)
+        table = self.distances(problem)
+        used = time.time_ns()
+        rows = []
+        for i in range(len(actions)):
+            rows.append((puzzle, goal, format(state, 'x'), len(actions) - i, json.dumps(actions[i:]), used))
+            table[state] = len(actions) - i
+            state = problem.result(state, actions[i])
+        self.connection.executemany('INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?, ?)', rows)
+        excess = self.connection.execute('SELECT count(*) FROM solutions').fetchone()[0] - self.max_entries
+        if excess > 0:
+            self.connection.execute('DELETE FROM solutions WHERE rowid IN (SELECT rowid FROM solutions ORDER BY used LIMIT ?)', (excess,))
+            self.distance_tables.clear()
+        self.connection.commit()
+
+    # Runs the A* search through the cache. base_heuristic is the heuristic of the states that are not cached.
+    def search(self, astar, problem, base_heuristic, **options):
+        actions = self.lookup(problem, problem.initial)
+        if actions is not None:
+            return Path_Result(actions, 0)
+        distances = self.distances(problem)
+
+        def heuristic(state):
+            distance = distances.get(state)
+            if distance is None:
+                return base_heuristic(state)
+            self.exact_hits += 1
+            return distance
+
+        cached_problem = copy.copy(problem)
+        cached_problem.goal_test = lambda state: state in distances
+        result = astar(cached_problem, heuristic=heuristic, **options)
+        if result.path_cost is None:
+            return result
+        actions = result.actions()
+        if not problem.goal_test(result.node.state):
+            suffix = self.fetch(problem, result.node.state)
+            if suffix is None:
+                # Another process evicted the entry after its distance was loaded, so the search is made again with fresh distances.
+                self.distance_tables.clear()
+                return self.search(astar, problem, base_heuristic, **options)
+            actions = actions + suffix
+        self.store(problem, problem.initial, actions)
+        return Path_Result(actions, result.expanded_nodes, result.stats)
+
+    def counters(self):
+        return {'hits': self.hits, 'misses': self.misses, 'exact_hits': self.exact_hits}
+
+    def close(self):
+        self.connection.close()
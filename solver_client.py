@@ -0,0 +1,96 @@
+import json
+import os
+import socket
+import sys
+import tempfile
+import time
+
+# Thin client of the resident solver (solver_server.py). It only sends the input files to the server and writes what it gets back, so it
+# starts as fast as Python itself and none of the solvers are imported. The output files are the same as the ones of part1.py and part2.py,
+# and part1's lines on stdout are printed too, so a caller can switch from "python3 part1.py in out" to "python3 solver_client.py 1 in out".
+#
+#   python3 solver_client.py <1|2> <input_file> <output_file> [<input_file> <output_file> ...] [--socket PATH] [--stats]
+#
+# Several input/output pairs are sent as one batched request. --stats prints the latency percentiles of the server afterwards.
+
+default_socket = os.path.join(tempfile.gettempdir(), 'eight_puzzle_solver.sock')
+
+
+class Solver_Client:
+
+    def __init__(self, path=default_socket):
+        self.connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.connection.connect(path)
+        self.reader = self.connection.makefile('r', encoding='utf-8')
+
+    # Sends one request and returns the reply. While the server is busy, the request is sent again after a growing pause.
+    def request(self, message, retries=20):
+        pause = 0.01
+        for attempt in range(retries + 1):
+            self.connection.sendall((json.dumps(message) + '\n').encode('utf-8'))
+            reply = json.loads(self.reader.readline())
+            if reply.get('status') != 'busy' or attempt == retries:
+                return reply
+            time.sleep(pause)
+            pause = min(pause * 2, 1.0)
+
+    # Solves the puzzles, given as (id, text of the input file) pairs, and returns their records in the same order.
+    def solve(self, part, puzzles, timeout=None):
+        reply = self.request({'part': part, 'timeout': timeout, 'puzzles': [{'id': puzzle_id, 'state': text} for puzzle_id, text in puzzles]})
+        if reply['status'] != 'ok':
+            raise RuntimeError(reply.get('error', reply['status']))
+        return reply['results']
+
+    def stats(self):
+        return self.request({'command': 'stats'})
+
+    def shutdown(self):
+        return self.request({'command': 'shutdown'})
+
+    def close(self):
+        self.reader.close()
+        self.connection.close()
+
+
+def milliseconds(seconds):
+    return '-' if seconds is None else ('%.1f' % (seconds * 1000)) + ' ms'
+
+
+if __name__ == '__main__':
+
+    arguments = sys.argv[1:]
+    path = default_socket
+    if '--socket' in arguments:
+        position = arguments.index('--socket')
+        path = arguments[position + 1]
+        del arguments[position:position + 2]
+    show_stats = '--stats' in arguments
+    if show_stats:
+        arguments.remove('--stats')
+    if len(arguments) < 3 or len(arguments) % 2 == 0 or arguments[0] not in ('1', '2'):
+        print("Usage: python solver_client.py <1|2> <input_file> <output_file> [<input_file> <output_file> ...] [--socket PATH] [--stats]")
+        exit(1)
+
+    part = int(arguments[0])
+    pairs = list(zip(arguments[1::2], arguments[2::2]))
+    puzzles = []
+    for input_file, output_file in pairs:
+        with open(input_file, 'r') as file:
+            puzzles.append((input_file, file.read()))
+
+    client = Solver_Client(path)
+    failed = 0
+    for (input_file, output_file), record in zip(pairs, client.solve(part, puzzles)):
+        if record['status'] != 'ok':
+            print(input_file + ': ' + record['status'] + ' (' + record['error'] + ')', file=sys.stderr)
+            failed += 1
+            continue
+        sys.stdout.write(record['stdout'])
+        with open(output_file, 'w') as file:
+            file.write(record['text'])
+    if show_stats:
+        stats = client.stats()
+        print('requests ' + str(stats['requests']) + ', puzzles ' + str(stats['puzzles']) + ', busy ' + str(stats['busy'])
+              + ', p50 ' + milliseconds(stats['p50']) + ', p99 ' + milliseconds(stats['p99']), file=sys.stderr)
+    client.close()
+    exit(1 if failed else 0)
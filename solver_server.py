@@ -0,0 +1,190 @@
+import argparse
+import json
+import math
+import os
+import signal
+import socketserver
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import batch
+import part1
+import part2
+from solver_client import default_socket
+
+# Resident solver. It listens on a Unix socket and solves the puzzles of part1 and part2 on a pool of worker processes that stay alive,
+# so the interpreter start, the imports and the heuristic tables are paid once per worker instead of once per puzzle.
+#
+#   python3 solver_server.py [--socket PATH] [--workers N] [--max-pending N] [--memory MB]
+#
+# The protocol is one JSON object per line in both directions, and a connection can send any number of requests:
+#   {"part": 1, "puzzles": [{"id": "a", "state": "1 2 3\n4 5 6\n7 8 0"}, ...], "timeout": 10}
+#       -> {"status": "ok", "results": [record, ...]}, the records of batch.py with the text of the output file in 'text' and the lines
+#          part1.py prints in 'stdout'
+#   {"command": "stats"}     -> the numbers of requests, puzzles and busy replies, and the p50 and p99 latency of the recent requests
+#   {"command": "shutdown"}  -> stops the server
+#
+# Every connection is served by its own thread, which waits for the workers. At most max_pending puzzles are accepted at a time; a request
+# that does not fit is answered with {"status": "busy"} right away, and the client sends it again later (see solver_client.py).
+
+
+# Runs in the workers. The state is the text of an input file, parsed as the CLIs parse it. A state that cannot be parsed gets an error
+# record like batch.py gives it, so the other puzzles of the request are still solved.
+def solve_request_puzzle(part, puzzle_id, text, timeout):
+    module = part1 if part == 1 else part2
+    try:
+        input_state = module.board_3x3.parse(text)
+    except Exception as error:
+        return error_record(puzzle_id, error)
+    record = batch.solve_puzzle(part, puzzle_id, input_state, timeout)
+    if record['status'] == 'ok':
+        record['text'] = batch.format_text(part, record)
+        record['stdout'] = ''
+        if part == 1:
+            record['stdout'] = ''.join(part1.unpack_state(part1.Node.check_actions_path(record['state'], result['actions'])) + '\n'
+                                       for result in record['results'])
+    return record
+
+def error_record(puzzle_id, error):
+    return {'id': puzzle_id, 'status': 'error', 'error': repr(error), 'state': None}
+
+# Builds the heuristic tables of both parts in a new worker, so the first request it gets is as fast as the others.
+def init_worker(memory_mb):
+    batch.init_worker(memory_mb)
+    part1.board_3x3.heuristic_tables(part1.board_3x3.goal_state(1))
+    part2.board_3x3.heuristic_tables(part2.board_3x3.goal_state(3))
+
+
+class Solver_Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+
+    daemon_threads = True
+
+    def __init__(self, path, workers=None, max_pending=None, memory_mb=None, latency_samples=10000):
+        if os.path.exists(path):
+            os.remove(path)
+        super().__init__(path, Request_Handler)
+        workers = workers or os.cpu_count()
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(memory_mb,))
+        self.max_pending = max_pending or 4 * workers
+        self.pending = 0
+        self.lock = threading.Lock()
+        self.latencies = deque(maxlen=latency_samples)  # Seconds of the recent requests.
+        self.requests = 0
+        self.puzzles = 0
+        self.busy = 0
+
+    # Takes count places among the pending puzzles, or none if they do not fit. A batch larger than max_pending is still taken when nothing
+    # else is pending, otherwise it would never be served.
+    def reserve(self, count):
+        with self.lock:
+            if self.pending + count > self.max_pending and self.pending > 0:
+                self.busy += 1
+                return False
+            self.pending += count
+            return True
+
+    def release(self, count, seconds):
+        with self.lock:
+            self.pending -= count
+            self.requests += 1
+            self.puzzles += count
+            self.latencies.append(seconds)
+
+    # Every puzzle gets its own record, an error record if it has no state or its worker failed. The reserved places are released
+    # only when every puzzle that was sent to the workers is done.
+    def solve(self, message):
+        puzzles = message.get('puzzles', [])
+        if message.get('part') not in (1, 2):
+            return {'status': 'error', 'error': 'part must be 1 or 2'}
+        if not isinstance(puzzles, list):
+            return {'status': 'error', 'error': 'puzzles must be a list'}
+        start = time.perf_counter()
+        if not self.reserve(len(puzzles)):
+            return {'status': 'busy'}
+        try:
+            tasks = []
+            for number, puzzle in enumerate(puzzles):
+                puzzle_id = str(puzzle.get('id', number)) if isinstance(puzzle, dict) else str(number)
+                try:
+                    if not isinstance(puzzle, dict) or not isinstance(puzzle.get('state'), str):
+                        raise ValueError('the puzzle has no state')
+                    tasks.append((puzzle_id, self.executor.submit(solve_request_puzzle, message['part'], puzzle_id, puzzle['state'],
+                                                                  message.get('timeout'))))
+                except Exception as error:
+                    tasks.append((puzzle_id, error_record(puzzle_id, error)))
+            results = [task_result(puzzle_id, task) for puzzle_id, task in tasks]
+        finally:
+            self.release(len(puzzles), time.perf_counter() - start)
+        return {'status': 'ok', 'results': results}
+
+    def stats(self):
+        with self.lock:
+            latencies = sorted(self.latencies)
+            return {'status': 'ok', 'requests': self.requests, 'puzzles': self.puzzles, 'busy': self.busy, 'pending': self.pending,
+                    'max_pending': self.max_pending, 'p50': percentile(latencies, 0.50), 'p99': percentile(latencies, 0.99)}
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(cancel_futures=True)
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+
+# The record of a puzzle from its future, or the record it already has when it was not sent to the workers.
+def task_result(puzzle_id, task):
+    if isinstance(task, dict):
+        return task
+    try:
+        return task.result()
+    except Exception as error:
+        return error_record(puzzle_id, error)
+
+# The nearest-rank percentile of sorted values, None if there are none.
+def percentile(values, fraction):
+    if not values:
+        return None
+    return values[max(math.ceil(fraction * len(values)) - 1, 0)]
+
+
+class Request_Handler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                message = json.loads(line)
+                command = message.get('command')
+                if command == 'stats':
+                    reply = self.server.stats()
+                elif command == 'shutdown':
+                    reply = {'status': 'ok'}
+                    threading.Thread(target=self.server.shutdown).start()
+                else:
+                    reply = self.server.solve(message)
+            except Exception as error:
+                reply = {'status': 'error', 'error': repr(error)}
+            self.wfile.write((json.dumps(reply) + '\n').encode('utf-8'))
+            self.wfile.flush()
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Serves the solvers of part1 and part2 on a Unix socket.')
+    parser.add_argument('--socket', default=default_socket, help='path of the socket (default: ' + default_socket + ')')
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes (default: number of CPUs)')
+    parser.add_argument('--max-pending', type=int, default=None, help='puzzles accepted at a time (default: 4 per worker)')
+    parser.add_argument('--memory', type=int, default=None, help='memory cap of every worker in MB')
+    args = parser.parse_args()
+
+    server = Solver_Server(args.socket, args.workers, args.max_pending, args.memory)
+    signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown).start())
+    print('Listening on ' + args.socket, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,126 @@
+import sys
+from math import perm
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from sliding_puzzle import Board
+
+# Layer-synchronous breadth-first search with NumPy, for the work that goes over the whole state space (distance tables, checking which
+# states are reachable, solving many states at once). Instead of expanding one node at a time, a whole BFS layer is kept as an array of
+# packed states and all of its children are generated with array operations: for every (blank index, target) pair of the board, the states
+# with a blank at the index and a tile at the target slide the tile with two shifts, as Board.move does for a single state.
+#
+# The states are numbered like in lean_search.py (the positions of the tiles 1, 2, ... as a partial permutation of the cells), so the
+# states of a board with b blanks are ranked between 0 and cells! / b! - 1. The distances are kept in a byte table indexed by the rank,
+# which is also the visited table of the search: a child is new when its byte is still UNREACHED.
+#
+# The layers are the same as the ones of a plain breadth-first search, so the layer sizes and the distances are exactly the ones of bfs
+# in part1.py (and of the distance oracles); only the order of the states within a layer differs. NumPy is an optional dependency,
+# it is only needed when a Layer_BFS is made.
+
+# Byte of the states that have not been reached.
+UNREACHED = 255
+
+
+class Layer_BFS:
+
+    def __init__(self, board, blank_count, max_size=1 << 28):
+        if numpy is None:
+            raise ImportError('the layer BFS needs NumPy (pip install numpy)')
+        if board.bits * board.cells > 64:
+            raise ValueError('the states of a ' + str(board.rows) + 'x' + str(board.cols) + ' board do not fit in 64 bits')
+        self.board = board
+        self.blank_count = blank_count
+        self.tiles = board.cells - blank_count
+        self.size = perm(board.cells, self.tiles)
+        if self.size > max_size:
+            raise ValueError('the states of a ' + str(board.rows) + 'x' + str(board.cols) + ' board are too many to be numbered')
+        self.shifts = numpy.array(board.shifts, dtype=numpy.uint64)
+        self.mask = numpy.uint64(board.mask)
+        # The (index, target, target shift, index shift) of every move of the board: the tile at target slides into the blank at index.
+        self.edges = [(index, target, numpy.uint64(board.shifts[target]), numpy.uint64(board.shifts[index]))
+                      for index in range(board.cells) for action, target in board.neighbors[index]]
+        self.distances = None
+
+    # The cell values of the states, one row per state.
+    def values(self, states):
+        return ((states[:, None] >> self.shifts[None, :]) & self.mask).astype(numpy.uint8)
+
+    # The ranks of the states. Sorting the cells by their values puts the blanks first and then the tiles 1, 2, ... in order, so the
+    # sorted indices after the blanks are the positions of the tiles.
+    def rank(self, states, values=None):
+        if values is None:
+            values = self.values(states)
+        positions = numpy.argsort(values, axis=1, kind='stable')[:, self.blank_count:]
+        ranks = numpy.zeros(len(states), dtype=numpy.int64)
+        for tile in range(self.tiles):
+            position = positions[:, tile]
+            smaller = (positions[:, :tile] < position[:, None]).sum(axis=1)
+            ranks = ranks * (self.board.cells - tile) + position - smaller
+        return ranks
+
+    # All the children of the states of a layer. Moves of a blank onto another blank are left out, since they give the same state back.
+    def expand(self, layer, values):
+        children = []
+        for index, target, target_shift, index_shift in self.edges:
+            selected = layer[(values[:, index] == 0) & (values[:, target] != 0)]
+            if len(selected):
+                tile = (selected >> target_shift) & self.mask
+                children.append(selected - (tile << target_shift) + (tile << index_shift))
+        if not children:
+            return numpy.zeros(0, dtype=numpy.uint64)
+        return numpy.concatenate(children)
+
+    # Searches from the start state layer by layer and returns the layer sizes, where layer d holds the states at distance d. With a goal,
+    # the search stops with the layer of the goal, so the number of layers minus one is the optimal path cost (None if it is not reached).
+    # Without one, it goes over every state reachable from the start, and their distances are left in the distances table.
+    def run(self, start, goal=None):
+        self.distances = numpy.full(self.size, UNREACHED, dtype=numpy.uint8)
+        layer = numpy.array([start], dtype=numpy.uint64)
+        self.distances[self.rank(layer)] = 0
+        sizes = [1]
+        depth = 0
+        while len(layer):
+            if goal is not None and (layer == numpy.uint64(goal)).any():
+                return sizes
+            depth += 1
+            if depth == UNREACHED:
+                raise ValueError('the distances do not fit in a byte')
+            children = self.expand(layer, self.values(layer))
+            ranks = self.rank(children)
+            new = self.distances[ranks] == UNREACHED
+            ranks, first = numpy.unique(ranks[new], return_index=True)
+            layer = children[new][first]
+            self.distances[ranks] = depth
+            if len(layer):
+                sizes.append(len(layer))
+        return None if goal is not None else sizes
+
+    # The distance of the state found by the last run, or None if it was not reached.
+    def distance(self, state):
+        distance = int(self.distances[self.rank(numpy.array([state], dtype=numpy.uint64))[0]])
+        return None if distance == UNREACHED else distance
+
+
+if __name__ == '__main__':
+
+    # Prints the sizes of the BFS layers around the goal of part1 (one blank) or part2 (three blanks) of a board, e.g.
+    # "python vector_bfs.py 1" or "python vector_bfs.py 2 3x4". A state can be given to search from it instead of the goal.
+    if len(sys.argv) not in (2, 3, 4) or sys.argv[1] not in ('1', '2'):
+        print("Usage: python vector_bfs.py <1|2> [<rows>x<cols>] [<state>]")
+        exit(1)
+
+    arguments = sys.argv[2:]
+    board = Board(3, 3)
+    if arguments and 'x' in arguments[0]:
+        rows, cols = arguments.pop(0).split('x')
+        board = Board(int(rows), int(cols))
+    blank_count = 1 if sys.argv[1] == '1' else 3
+    start = board.parse(arguments[0]) if arguments else board.goal_state(blank_count)
+    sizes = Layer_BFS(board, blank_count).run(start)
+    for depth, size in enumerate(sizes):
+        print(str(depth).rjust(3) + str(size).rjust(12))
+    print('Reachable states: ' + str(sum(sizes)))